@@ -1,4 +1,5 @@
 CREATE EXTENSION IF NOT EXISTS pgcrypto;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 CREATE TABLE models (
   id               UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -41,3 +42,41 @@ CREATE TABLE user_input (
 );
 
 CREATE INDEX IF NOT EXISTS idx_templates_labels_gin ON templates USING GIN (labels);
+
+-- 검색 인덱스: 전문 검색(tsvector + GIN) + 제목 퍼지 매칭(pg_trgm)
+-- 'simple' 사전은 형태소 분석 없이 공백 단위로 토큰화하므로 한국어에도 그대로 동작하며,
+-- 조사/어미가 붙은 단어는 trigram 유사도로 보완한다.
+ALTER TABLE prompts ADD COLUMN IF NOT EXISTS search_vector tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(content, '')), 'C')
+  ) STORED;
+
+ALTER TABLE templates ADD COLUMN IF NOT EXISTS search_vector tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(jsonb_to_tsvector('simple', coalesce(labels, '[]'::jsonb), '["string"]'), 'B') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_prompts_search_vector_gin ON prompts USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_prompts_title_trgm ON prompts USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_templates_search_vector_gin ON templates USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_templates_name_trgm ON templates USING GIN (name gin_trgm_ops);
+
+-- 토큰 사용량 분 단위 롤업 (애플리케이션이 주기적으로 ON CONFLICT 가산 upsert)
+CREATE TABLE IF NOT EXISTS usage_rollups (
+  bucket_start       TIMESTAMPTZ NOT NULL,     -- 분 단위 버킷 시작 시각
+  provider           TEXT NOT NULL,            -- grok | openai | gemini
+  model              TEXT NOT NULL,            -- 업스트림이 보고한 모델명
+  prompt_key         TEXT NOT NULL,            -- prompt id 또는 본문 해시
+  client_key         TEXT NOT NULL DEFAULT '', -- X-Client-Key / client_key / IP
+  requests           INTEGER NOT NULL DEFAULT 0,
+  prompt_tokens      BIGINT NOT NULL DEFAULT 0,
+  completion_tokens  BIGINT NOT NULL DEFAULT 0,
+  stream_seconds     DOUBLE PRECISION NOT NULL DEFAULT 0,  -- 슬롯 확보 ~ 스트림 종료 시간 합
+  PRIMARY KEY (bucket_start, provider, model, prompt_key, client_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_usage_rollups_model_bucket ON usage_rollups (provider, model, bucket_start);
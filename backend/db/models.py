@@ -1,9 +1,9 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, Text, JSON, TIMESTAMP
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import BigInteger, Column, Computed, Float, Integer, String, Text, JSON, TIMESTAMP
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import declarative_base, deferred
 
 Base = declarative_base()
 
@@ -33,6 +33,13 @@ class Prompt(Base):
     labels = Column(JSON, default=list)                                     # 태그/라벨
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
     updated_at = Column(TIMESTAMP, default=datetime.utcnow)
+    # 검색용 tsvector(생성 컬럼, 정의는 db/init.sql) - 목록 응답에 실리지 않도록 지연 로딩
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(content, '')), 'C')",
+        persisted=True,
+    )))
 
 
 class Template(Base):
@@ -48,6 +55,13 @@ class Template(Base):
     schema = Column(JSON, nullable=False)                                   # 템플릿 전체 JSON(Schema/UiSchema)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
     updated_at = Column(TIMESTAMP, default=datetime.utcnow)
+    # 검색용 tsvector(생성 컬럼, 정의는 db/init.sql) - 목록 응답에 실리지 않도록 지연 로딩
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(jsonb_to_tsvector('simple', coalesce(labels, '[]'::jsonb), '[\"string\"]'), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+        persisted=True,
+    )))
 
 
 class UserInput(Base):
@@ -65,3 +79,20 @@ class UserInput(Base):
     input_text = Column(Text)                                               # 텍스트 입력값
     input_form = Column(JSON)                                               # 폼 입력값 {field:value}
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+
+class UsageRollup(Base):
+    """
+    토큰 사용량 분 단위 롤업: (버킷, 프로바이더, 모델, 프롬프트, 클라이언트) 별 누적치.
+    """
+    __tablename__ = "usage_rollups"
+
+    bucket_start = Column(TIMESTAMP(timezone=True), primary_key=True)      # 분 단위 버킷 시작 시각
+    provider = Column(Text, primary_key=True)                               # grok | openai | gemini
+    model = Column(Text, primary_key=True)                                  # 업스트림이 보고한 모델명
+    prompt_key = Column(Text, primary_key=True)                             # prompt id 또는 본문 해시
+    client_key = Column(Text, primary_key=True, default="")                 # 클라이언트 키(없으면 '')
+    requests = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
+    stream_seconds = Column(Float, nullable=False, default=0.0)             # 슬롯 확보 ~ 스트림 종료 시간 합
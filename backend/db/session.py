@@ -1,4 +1,6 @@
 import logging
+import time
+from collections import deque
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
@@ -11,38 +13,151 @@ logger = logging.getLogger(__name__)
 engine = None
 SessionLocal: async_sessionmaker | None = None
 
+# 읽기 전용 엔드포인트용 레플리카(미설정이면 primary 사용)
+read_engine = None
+ReadSessionLocal: async_sessionmaker | None = None
+
+_initialized = False
+
+# 풀 체크아웃 대기 시간(초) 샘플: {"primary": deque, "replica": deque}
+_checkout_waits: dict[str, deque] = {}
+
+
+def _async_url(url: str) -> str:
+    # convert sync URL to async if needed
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+def _create_engine(url: str):
+    return create_async_engine(
+        _async_url(url),
+        echo=False,
+        future=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={
+            # asyncpg 자체 캐시 + SQLAlchemy asyncpg 어댑터의 prepared statement 캐시 (pgbouncer 사용 시 0)
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        },
+    )
+
 
 def init_engine():
-    global engine, SessionLocal
+    global engine, SessionLocal, read_engine, ReadSessionLocal, _initialized
+    _initialized = True
     if not settings.database_url:
         logger.warning("DATABASE_URL not set; DB connections will be unavailable")
         return
-    # convert sync URL to async if needed
-    url = settings.database_url
-    if url.startswith("postgresql://"):
-        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
-    engine = create_async_engine(url, echo=False, future=True)
+    engine = _create_engine(settings.database_url)
     SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
-    logger.info("SQLAlchemy async engine initialized")
+    if settings.database_read_url:
+        read_engine = _create_engine(settings.database_read_url)
+        ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+    logger.info(
+        "SQLAlchemy async engine initialized",
+        extra={"pool_size": settings.db_pool_size, "max_overflow": settings.db_max_overflow, "replica": bool(read_engine)},
+    )
+
+
+def ensure_engine():
+    """첫 사용 시 엔진을 만든다(기동 시점에 DB 연결을 강제하지 않음)."""
+    if not _initialized:
+        init_engine()
+
+
+async def prewarm_engine(connections: int) -> int:
+    """풀에 커넥션을 미리 열어 둔다. 연 커넥션 수를 반환."""
+    ensure_engine()
+    opened = 0
+    for eng in (engine, read_engine):
+        if eng is None:
+            continue
+        conns = [await eng.connect() for _ in range(max(0, connections))]
+        opened += len(conns)
+        for conn in conns:
+            await conn.close()
+    return opened
 
 
 async def close_engine():
-    global engine
+    global engine, SessionLocal, read_engine, ReadSessionLocal, _initialized
+    _initialized = False
+    if read_engine:
+        await read_engine.dispose()
+        read_engine = None
+        ReadSessionLocal = None
     if engine:
         await engine.dispose()
         engine = None
+        SessionLocal = None
 
 
 @asynccontextmanager
-async def get_session() -> AsyncIterator[AsyncSession]:
-    if not SessionLocal:
+async def get_session(readonly: bool = False) -> AsyncIterator[AsyncSession]:
+    """
+    readonly=True 이면 레플리카(설정된 경우)로 라우팅한다.
+    커넥션을 먼저 체크아웃하여 풀 대기 시간을 측정한다.
+    """
+    ensure_engine()
+    factory, role = SessionLocal, "primary"
+    if readonly and ReadSessionLocal:
+        factory, role = ReadSessionLocal, "replica"
+    if not factory:
         raise RuntimeError("DB engine not initialized; set DATABASE_URL")
-    session = SessionLocal()
+    session = factory()
     try:
+        started = time.perf_counter()
+        await session.connection()
+        _checkout_waits.setdefault(role, deque(maxlen=1000)).append(time.perf_counter() - started)
         yield session
-        await session.commit()
+        if not readonly:
+            await session.commit()
     except Exception:
         await session.rollback()
         raise
     finally:
         await session.close()
+
+
+async def db_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI 의존성: primary 세션(요청 종료 시 commit)."""
+    async with get_session() as session:
+        yield session
+
+
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI 의존성: 읽기 전용 세션(레플리카 우선)."""
+    async with get_session(readonly=True) as session:
+        yield session
+
+
+def _pool_stats(eng, role: str) -> dict:
+    pool = eng.sync_engine.pool
+    capacity = settings.db_pool_size + settings.db_max_overflow
+    checked_out = pool.checkedout()
+    waits = sorted(_checkout_waits.get(role, ()))
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+        "checkout_wait_ms_avg": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+        "checkout_wait_ms_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 2) if waits else 0.0,
+        "checkout_wait_ms_max": round(waits[-1] * 1000, 2) if waits else 0.0,
+    }
+
+
+def pool_stats() -> dict:
+    out = {}
+    if engine:
+        out["primary"] = _pool_stats(engine, "primary")
+    if read_engine:
+        out["replica"] = _pool_stats(read_engine, "replica")
+    return out
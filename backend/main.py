@@ -1,10 +1,15 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
-from routes import router, ai_hub_router
-from routes import templates_api
-from db.session import init_engine, close_engine
+from routes import router, ai_hub_router, ws_router
+from routes import templates_api, search_api, admin_api, usage_api
+from db.session import close_engine
+from services import close_services
+from services.usage import usage_recorder
+from services.warmup import start_warmup, stop_warmup
+from middleware import BodySizeLimitMiddleware, CompressionMiddleware, ProfilingMiddleware, loop_lag_monitor
 
 # 로깅 설정
 logging.basicConfig(
@@ -16,13 +21,38 @@ logging.basicConfig(
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 프로바이더 어댑터/DB 엔진은 첫 사용 시 지연 초기화. PREWARM_ENABLED 면 백그라운드에서 미리 연결하고
+    # 끝날 때까지 /api/health/ready 는 503
+    if settings.loop_lag_monitor_enabled:
+        loop_lag_monitor.start()
+    # 토큰 사용량 롤업 주기적 flush (종료 시 남은 버킷까지 반영)
+    if settings.usage_enabled:
+        usage_recorder.start()
+    start_warmup()
+    yield
+    await stop_warmup()
+    await loop_lag_monitor.stop()
+    await usage_recorder.stop()
+    await close_services()
+    await close_engine()
+
+
 # FastAPI 앱 초기화
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     debug=settings.debug,
+    lifespan=lifespan,
 )
 
+# 요청 프로파일링(X-Profile + 관리자 토큰) / 단계별 타이밍 기준 시각
+app.add_middleware(ProfilingMiddleware)
+
+# 요청 본문 크기 제한 (JSON 파싱 전 조기 거절, 413 에도 CORS 헤더가 붙도록 CORS 안쪽에 둔다)
+app.add_middleware(BodySizeLimitMiddleware, max_body_bytes=settings.max_request_body_bytes)
+
 # CORS 설정 (프론트엔드와 통신을 위해)
 app.add_middleware(
     CORSMiddleware,
@@ -32,10 +62,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (JSON 은 일반 압축, SSE 는 이벤트 단위 flush)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        level=settings.compression_level,
+    )
+
 # 라우터 등록
 app.include_router(router)  # health check 포함
 app.include_router(ai_hub_router)
+app.include_router(ws_router)
 app.include_router(templates_api.router)
+app.include_router(search_api.router)
+app.include_router(admin_api.router)
+app.include_router(usage_api.router)
 
 
 @app.get("/")
@@ -56,14 +98,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.debug,
+        # WebSocket 메시지도 HTTP 본문과 같은 한도로 프레임 수신 단계에서 제한(uvicorn 기본 16MB)
+        ws_max_size=settings.max_request_body_bytes,
     )
-
-
-@app.on_event("startup")
-async def on_startup():
-    init_engine()
-
-
-@app.on_event("shutdown")
-async def on_shutdown():
-    await close_engine()
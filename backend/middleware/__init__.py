@@ -0,0 +1,5 @@
+from .body_limit import BodySizeLimitMiddleware
+from .compression import CompressionMiddleware, get_compression_stats
+from .profiling import ProfilingMiddleware, loop_lag_monitor
+
+__all__ = ["BodySizeLimitMiddleware", "CompressionMiddleware", "get_compression_stats", "ProfilingMiddleware", "loop_lag_monitor"]
@@ -0,0 +1,74 @@
+import logging
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class BodySizeLimitMiddleware:
+    """
+    요청 본문 크기 상한. JSON 파싱/검증 전에 거절하여 워커 메모리를 제한한다.
+
+    - Content-Length 가 상한을 넘으면 본문을 읽지 않고 즉시 413
+    - Content-Length 가 없으면(chunked) 상한까지만 읽어 보고, 넘으면 413 / 아니면 읽은 본문을 그대로 재생
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, size: int | None) -> None:
+        logger.warning(
+            "[BodyLimit] Request body rejected",
+            extra={"path": scope.get("path"), "size": size, "max": self.max_body_bytes},
+        )
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"request body too large (max {self.max_body_bytes} bytes)"},
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None:
+            try:
+                size = int(content_length)
+            except ValueError:
+                await self._reject(scope, receive, send, None)
+                return
+            if size > self.max_body_bytes:
+                await self._reject(scope, receive, send, size)
+                return
+            await self.app(scope, receive, send)
+            return
+
+        # chunked: 상한까지만 버퍼링
+        chunks = []
+        total = 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                # disconnect 등은 그대로 앱에 전달
+                chunks.append(message)
+                break
+            body = message.get("body", b"")
+            total += len(body)
+            if total > self.max_body_bytes:
+                await self._reject(scope, receive, send, total)
+                return
+            chunks.append(message)
+            if not message.get("more_body", False):
+                break
+
+        async def replay() -> Message:
+            if chunks:
+                return chunks.pop(0)
+            return await receive()
+
+        await self.app(scope, replay, send)
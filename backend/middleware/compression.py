@@ -0,0 +1,255 @@
+import logging
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# brotli / zstd 는 선택 의존성: 설치되어 있을 때만 협상 후보에 포함
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+# 압축 통계 (프로세스 단위)
+compression_stats = {
+    "responses_compressed": 0,
+    "responses_skipped": 0,
+    "streams_compressed": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+    "by_encoding": {},
+}
+
+
+def get_compression_stats() -> dict:
+    stats = dict(compression_stats)
+    stats["by_encoding"] = {k: dict(v) for k, v in compression_stats["by_encoding"].items()}
+    stats["bytes_saved"] = stats["bytes_in"] - stats["bytes_out"]
+    return stats
+
+
+def _record(encoding: str, raw: int, compressed: int):
+    compression_stats["bytes_in"] += raw
+    compression_stats["bytes_out"] += compressed
+    per = compression_stats["by_encoding"].setdefault(encoding, {"bytes_in": 0, "bytes_out": 0})
+    per["bytes_in"] += raw
+    per["bytes_out"] += compressed
+
+
+class _Encoder:
+    """
+    인코딩별 스트리밍 압축기 공통 인터페이스: compress(chunk, flush) / finish().
+    flush=True 이면 지금까지 입력된 데이터를 클라이언트가 즉시 해제할 수 있도록 블록을 비운다.
+    """
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=min(level, 11))
+        elif encoding == "zstd":
+            self._c = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self._c = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._c.process(data)
+            return out + self._c.flush() if flush else out
+        out = self._c.compress(data)
+        if flush:
+            if self.encoding == "zstd":
+                out += self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            else:
+                out += self._c.flush(zlib.Z_SYNC_FLUSH)
+        return out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._c.finish()
+        return self._c.flush()
+
+
+def available_encodings() -> list[str]:
+    encodings = []
+    if brotli is not None:
+        encodings.append("br")
+    if zstandard is not None:
+        encodings.append("zstd")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, supported: list[str]) -> Optional[str]:
+    """
+    Accept-Encoding 헤더에서 q 값이 가장 높은 지원 인코딩을 고른다(동률이면 supported 순서 우선).
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        parts = [p.strip() for p in item.split(";")]
+        name = parts[0].lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for enc in supported:
+        q = weights.get(enc, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    협상 기반 응답 압축(gzip, 설치 시 br/zstd).
+
+    - 일반 응답: minimum_size 미만이면 원본 그대로, 이상이면 압축
+    - text/event-stream: 전체를 버퍼링하지 않고, SSE 이벤트 경계(\\n\\n)마다 flush 하여 첫 바이트 지연을 유지
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, level: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.supported = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.supported)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size, self.level)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int, level: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.level = level
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+        self.is_stream = False
+        self.started = False
+        self.buffer = b""
+        self.raw_bytes = 0
+        self.out_bytes = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    def _start_compressed(self):
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self.encoder = _Encoder(self.encoding, self.level)
+
+    async def _emit(self, data: bytes, more_body: bool):
+        if data or not more_body:
+            self.out_bytes += len(data)
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or content_type.startswith(("image/", "video/", "audio/")):
+                self.passthrough = True
+            self.is_stream = content_type.startswith("text/event-stream")
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                compression_stats["responses_skipped"] += 1
+                await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        if self.is_stream:
+            # SSE: 헤더는 즉시 보내고, 이벤트 경계에서만 flush(부분 이벤트는 압축기 내부에 누적)
+            if not self.started:
+                self.started = True
+                self._start_compressed()
+                await self.send(self.start_message)
+            self.raw_bytes += len(body)
+            if more_body:
+                out = self.encoder.compress(body, flush=body.endswith(b"\n\n"))
+            else:
+                out = self.encoder.compress(body) + self.encoder.finish()
+            await self._emit(out, more_body)
+            if not more_body:
+                self._finish()
+            return
+
+        if not self.started:
+            self.buffer += body
+            if more_body and len(self.buffer) < self.minimum_size:
+                return
+            self.started = True
+            if len(self.buffer) < self.minimum_size:
+                compression_stats["responses_skipped"] += 1
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": self.buffer, "more_body": False})
+                return
+            self._start_compressed()
+            if not more_body:
+                compressed = self.encoder.compress(self.buffer) + self.encoder.finish()
+                headers = MutableHeaders(raw=self.start_message["headers"])
+                headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start_message)
+            body, self.buffer = self.buffer, b""
+            if not more_body:
+                self.raw_bytes += len(body)
+                await self._emit(compressed, False)
+                self._finish()
+                return
+
+        self.raw_bytes += len(body)
+        out = self.encoder.compress(body) if more_body else self.encoder.compress(body) + self.encoder.finish()
+        await self._emit(out, more_body)
+        if not more_body:
+            self._finish()
+
+    def _finish(self):
+        key = "streams_compressed" if self.is_stream else "responses_compressed"
+        compression_stats[key] += 1
+        _record(self.encoding, self.raw_bytes, self.out_bytes)
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import settings
+from utils.admin import is_admin_token
+from utils.profiling import LoopLagMonitor, SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+loop_lag_monitor = LoopLagMonitor(
+    interval=settings.loop_lag_interval_ms / 1000,
+    threshold=settings.loop_lag_threshold_ms / 1000,
+)
+
+
+def _write_report(path: str, report: str):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(report)
+    # 최신 profile_keep 개만 보관 (파일 이름이 ms 타임스탬프로 시작하므로 이름순 = 시간순)
+    reports = sorted(n for n in os.listdir(directory) if n.endswith(".folded.txt"))
+    for name in reports[:max(0, len(reports) - settings.profile_keep)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+class ProfilingMiddleware:
+    """
+    - 모든 요청: scope state 에 도착 시각(received_at)을 남겨 핸들러가 validate 구간을 잴 수 있게 한다.
+    - `X-Profile: 1` + 유효한 `X-Admin-Token`: 요청이 끝날 때까지 이벤트 루프 스레드를 샘플링하고,
+      보고서를 PROFILE_DIR 에 저장한 뒤 파일 이름을 `X-Profile-Report` 응답 헤더로 알려 준다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["received_at"] = time.perf_counter()
+        headers = Headers(scope=scope)
+        if headers.get("x-profile") not in ("1", "true") or not is_admin_token(headers.get("x-admin-token")):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        name = f"{int(time.time() * 1000)}-{re.sub(r'[^A-Za-z0-9]+', '_', path).strip('_')}.folded.txt"
+        profiler = SamplingProfiler(threading.get_ident(), settings.profile_interval_ms / 1000)
+        finished = False
+
+        async def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            profiler.stop()
+            timer = scope["state"].get("phase_timer")
+            report = profiler.report(f"{scope.get('method')} {path}", timer.phases if timer else None)
+            await asyncio.to_thread(_write_report, os.path.join(settings.profile_dir, name), report)
+            logger.info("[Profile] Report saved", extra={"path": path, "report": name})
+
+        async def send_with_profile(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-Report"] = name
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                await finish()
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            await finish()
@@ -1,5 +1,9 @@
 from .ai_hub import router
 from .text_submit import ai_hub_router
 from .templates_api import router as templates_router
+from .search_api import router as search_router
+from .admin_api import router as admin_router
+from .ai_hub_ws import ws_router
+from .usage_api import router as usage_router
 
-__all__ = ["router", "ai_hub_router", "templates_router"]
+__all__ = ["router", "ai_hub_router", "templates_router", "search_router", "admin_router", "ws_router", "usage_router"]
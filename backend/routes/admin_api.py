@@ -0,0 +1,35 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from config.settings import settings
+from middleware import loop_lag_monitor
+from utils.admin import require_admin
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """저장된 요청 프로파일 보고서 목록(최신순)"""
+    if not os.path.isdir(settings.profile_dir):
+        return []
+    return sorted(os.listdir(settings.profile_dir), reverse=True)
+
+
+@router.get("/profiles/{name}", response_class=PlainTextResponse)
+async def get_profile(name: str):
+    if os.path.basename(name) != name or not name.endswith(".folded.txt"):
+        raise HTTPException(status_code=400, detail="invalid profile name")
+    path = os.path.join(settings.profile_dir, name)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@router.get("/loop-lag")
+async def loop_lag():
+    """이벤트 루프 정지 기록(정지 시점의 루프 스레드 스택 포함)"""
+    return {**loop_lag_monitor.stats(), "stalls": list(loop_lag_monitor.stalls)}
@@ -1,4 +1,14 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from db.session import pool_stats
+from middleware import get_compression_stats, loop_lag_monitor
+from services import upstream_scheduler
+from services.warmup import is_ready, readiness
+from services.similarity_cache import similarity_cache
+from services.stream_buffer import stream_buffers
+from services.usage import usage_recorder
+from utils.profiling import phase_stats
 
 router = APIRouter(prefix="/api/health", tags=["health"])
 
@@ -7,3 +17,24 @@ router = APIRouter(prefix="/api/health", tags=["health"])
 async def health_check():
     """헬스 체크 엔드포인트"""
     return {"status": "healthy", "service": "api"}
+
+
+@router.get("/ready")
+async def ready():
+    """준비 상태(pre-warm 완료 여부). pre-warm 진행 중이거나 실패한 대상이 있으면 503"""
+    return JSONResponse(status_code=200 if is_ready() else 503, content=readiness)
+
+
+@router.get("/metrics")
+async def metrics():
+    """프로세스 단위 런타임 지표"""
+    return {
+        "compression": get_compression_stats(),
+        "scheduler": upstream_scheduler.stats(),
+        "similarity_cache": similarity_cache.get_stats(),
+        "stream_buffers": stream_buffers.stats(),
+        "ai_hub_phases": phase_stats(),
+        "loop_lag": loop_lag_monitor.stats(),
+        "db_pool": pool_stats(),
+        "usage": usage_recorder.stats(),
+    }
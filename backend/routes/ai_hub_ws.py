@@ -0,0 +1,198 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import aclosing
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from config.settings import settings
+from routes.text_submit import start_prompt_stream
+from schemas import AiHubRequest
+from services.stream_buffer import StreamBuffer, StreamExpired, stream_buffers
+from utils.profiling import PhaseTimer
+
+logger = logging.getLogger(__name__)
+
+ws_router = APIRouter(prefix="/api/ai_hub", tags=["ai-hub"])
+
+
+class _Stream:
+    """소켓 안의 스트림 하나: 버퍼를 읽어 보내는 송신 태스크 + 크레딧 기반 흐름 제어."""
+
+    def __init__(self, req_id: str, buffer: StreamBuffer, window: int):
+        self.req_id = req_id
+        self.buffer = buffer
+        self.credit = window
+        self.credit_changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def grant(self, n: int):
+        self.credit += n
+        self.credit_changed.set()
+
+    async def wait_credit(self):
+        while self.credit <= 0:
+            self.credit_changed.clear()
+            await self.credit_changed.wait()
+        self.credit -= 1
+
+
+class _Connection:
+    """
+    WebSocket 하나에 여러 프롬프트 스트림을 req_id 로 다중화한다.
+
+    client -> server
+      {"type": "start",  "request": {...AiHubRequest...}}
+      {"type": "resume", "req_id": "...", "resume_token": "...", "last_event_id": 3}
+      {"type": "ack",    "req_id": "...", "count": 8}      # 흐름 제어 크레딧 반환
+      {"type": "cancel", "req_id": "..."}
+    server -> client
+      {"type": "handshake", "req_id", "result_code", "result_msg", "resume_token"}
+      {"type": "chunk", "req_id", "id", "ai_output"}
+      {"type": "end", "req_id"} / {"type": "error", "req_id", "status_code", "detail"}
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.ws = websocket
+        self.streams: dict[str, _Stream] = {}
+        self._send_lock = asyncio.Lock()
+        self.client_host = websocket.client.host if websocket.client else None
+
+    async def send(self, message: dict):
+        async with self._send_lock:
+            await self.ws.send_text(json.dumps(message, ensure_ascii=False))
+
+    async def error(self, req_id: Optional[str], status_code: int, detail):
+        await self.send({"type": "error", "req_id": req_id, "status_code": status_code, "detail": detail})
+
+    @staticmethod
+    async def _send_quietly(coro):
+        try:
+            await coro
+        except Exception:
+            pass
+
+    async def _pump(self, stream: _Stream, last_event_id: int):
+        """버퍼 -> 소켓. 크레딧이 없으면 이 스트림만 대기하고, 생산자는 버퍼에 계속 쌓는다."""
+        req_id = stream.req_id
+        try:
+            handshake = await stream.buffer.wait_handshake()
+            await self.send({"type": "handshake", **handshake, "req_id": req_id})
+            if handshake.get("result_code") != 0:
+                return
+            async with aclosing(stream.buffer.follow(last_event_id)) as events:
+                async for seq, payload in events:
+                    await stream.wait_credit()
+                    await self.send({"type": "chunk", "req_id": req_id, "id": seq, **json.loads(payload)})
+            if stream.buffer.error:
+                await self.error(req_id, 500, stream.buffer.error)
+            else:
+                await self.send({"type": "end", "req_id": req_id})
+        except StreamExpired as e:
+            await self._send_quietly(self.error(req_id, 410, str(e)))
+        except Exception as e:
+            # 소켓이 이미 닫힌 뒤의 송신 실패: 생산자는 그대로 두고(재개 가능) 송신 태스크만 끝낸다
+            logger.info("[AIHub WS] Send failed, stopping stream pump", extra={"req_id": req_id, "error": repr(e)})
+        finally:
+            if self.streams.get(req_id) is stream:
+                del self.streams[req_id]
+
+    def _open(self, req_id: str, buffer: StreamBuffer, last_event_id: int):
+        stream = _Stream(req_id, buffer, settings.ws_stream_window)
+        stream.task = asyncio.create_task(self._pump(stream, last_event_id))
+        self.streams[req_id] = stream
+
+    async def handle(self, message: dict):
+        kind = message.get("type")
+        req_id = message.get("req_id")
+
+        if kind == "start":
+            timer = PhaseTimer()
+            try:
+                request = AiHubRequest.model_validate(message.get("request") or {})
+            except ValidationError as e:
+                await self.error(req_id, 422, json.loads(e.json(include_input=False)))
+                return
+            timer.mark("validate")
+            req_id = request.req_id
+            if req_id in self.streams:
+                await self.error(req_id, 409, "stream with this req_id is already active on this connection")
+                return
+            if len(self.streams) >= settings.ws_max_streams:
+                await self.error(req_id, 429, f"too many concurrent streams (max {settings.ws_max_streams})")
+                return
+            try:
+                buffer, _ = start_prompt_stream(request, self.ws.headers, self.client_host, timer)
+            except HTTPException as e:
+                await self.error(req_id, e.status_code, e.detail)
+                return
+            self._open(req_id, buffer, 0)
+
+        elif kind == "resume":
+            buffer = stream_buffers.get(req_id, message.get("resume_token")) if req_id else None
+            if buffer is None:
+                await self.error(req_id, 410, "stream for req_id is no longer available")
+                return
+            if req_id in self.streams:
+                await self.error(req_id, 409, "stream with this req_id is already active on this connection")
+                return
+            self._open(req_id, buffer, int(message.get("last_event_id") or 0))
+
+        elif kind == "ack":
+            stream = self.streams.get(req_id)
+            if stream:
+                stream.grant(max(0, int(message.get("count") or 1)))
+
+        elif kind == "cancel":
+            stream = self.streams.pop(req_id, None)
+            if stream:
+                stream.task.cancel()
+                # 명시적 취소는 업스트림 생성도 중단(연결 끊김과 달리 재개 대상이 아님)
+                if stream.buffer.task and not stream.buffer.task.done():
+                    stream.buffer.task.cancel()
+                    stream.buffer.finish(error="cancelled")
+                await self.send({"type": "end", "req_id": req_id, "cancelled": True})
+
+        else:
+            await self.error(req_id, 400, f"unknown message type: {kind}")
+
+    async def close(self):
+        # 소켓이 끊기면 송신 태스크만 정리: 생산자는 계속 돌아 resume 으로 이어받을 수 있다
+        for stream in list(self.streams.values()):
+            stream.task.cancel()
+        self.streams.clear()
+
+
+@ws_router.websocket("/ws")
+async def ai_hub_ws(websocket: WebSocket):
+    await websocket.accept()
+    conn = _Connection(websocket)
+    started = time.monotonic()
+    logger.info("[AIHub WS] Connected", extra={"client": conn.client_host})
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            # 한도는 바이트 기준(한글은 글자당 3바이트). 서버의 ws_max_size 가 프레임 수신 단계에서 먼저 막는다
+            if len(raw.encode()) > settings.max_request_body_bytes:
+                await conn.error(None, 413, f"message too large (max {settings.max_request_body_bytes} bytes)")
+                continue
+            try:
+                message = json.loads(raw)
+            except json.JSONDecodeError:
+                await conn.error(None, 400, "invalid JSON")
+                continue
+            if not isinstance(message, dict):
+                await conn.error(None, 400, "message must be a JSON object")
+                continue
+            try:
+                await conn.handle(message)
+            except (TypeError, ValueError) as e:
+                await conn.error(message.get("req_id"), 400, str(e))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await conn.close()
+        logger.info("[AIHub WS] Disconnected", extra={"client": conn.client_host, "duration_s": round(time.monotonic() - started, 1)})
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 from sqlalchemy import select
 
-from db.session import get_session
+from db.session import db_session, read_session
 from db.models import Run
 
 router = APIRouter(prefix="/api/runs", tags=["runs"])
@@ -25,7 +25,7 @@ class RunCreate(BaseModel):
 
 
 @router.post("")
-async def create_run(payload: RunCreate, session=Depends(get_session)):
+async def create_run(payload: RunCreate, session=Depends(db_session)):
     run = Run(
         template_id=payload.template_id,
         template_version=payload.template_version,
@@ -44,7 +44,7 @@ async def create_run(payload: RunCreate, session=Depends(get_session)):
 
 
 @router.get("")
-async def list_runs(session=Depends(get_session)):
+async def list_runs(session=Depends(read_session)):
     result = await session.execute(
         select(Run.id, Run.template_id, Run.template_version, Run.model, Run.model_variant, Run.input_type, Run.created_at)
         .order_by(Run.created_at.desc())
@@ -54,7 +54,7 @@ async def list_runs(session=Depends(get_session)):
 
 
 @router.get("/{run_id}")
-async def get_run(run_id: uuid.UUID, session=Depends(get_session)):
+async def get_run(run_id: uuid.UUID, session=Depends(read_session)):
     run = await session.get(Run, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
@@ -0,0 +1,73 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, or_, select
+
+from db.session import read_session
+from db.models import Prompt, Template
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+# 'simple' 사전: 언어별 어간 처리 없이 토큰화(한국어 포함) - db/init.sql 의 생성 컬럼과 동일해야 인덱스를 탄다
+TS_CONFIG = "simple"
+MAX_LIMIT = 100
+
+
+def _ranked_query(model, title_col, q: str):
+    """
+    tsvector(GIN) 전문 검색 + 제목 trigram(GIN) 퍼지 매칭을 OR 로 묶고,
+    ts_rank_cd 와 word_similarity 를 합산한 점수로 정렬하는 select 를 만든다.
+    """
+    ts_query = func.websearch_to_tsquery(TS_CONFIG, q)
+    text_rank = func.ts_rank_cd(model.search_vector, ts_query)
+    fuzzy_rank = func.word_similarity(q, title_col)
+    score = (text_rank + fuzzy_rank).label("score")
+    cond = or_(
+        model.search_vector.op("@@")(ts_query),
+        title_col.op("%>")(q),  # q <% title (word similarity, gin_trgm_ops 인덱스 사용)
+    )
+    return score, cond
+
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="검색어(공백 구분, 따옴표/-제외 문법 지원)"),
+    kind: Literal["all", "prompts", "templates"] = "all",
+    limit: int = Query(20, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    session=Depends(read_session),
+):
+    """
+    프롬프트(title/content/description)와 템플릿(name/description/labels)을 검색한다.
+    결과는 점수 내림차순으로 정렬되며, 본문/스키마 등 큰 컬럼은 포함하지 않는다.
+    """
+    q = q.strip()
+    result = {"q": q, "limit": limit, "offset": offset}
+
+    if kind in ("all", "prompts"):
+        score, cond = _ranked_query(Prompt, Prompt.title, q)
+        rows = await session.execute(
+            select(Prompt.id, Prompt.title, Prompt.description, Prompt.labels, Prompt.updated_at, score)
+            .where(cond)
+            .order_by(score.desc(), Prompt.updated_at.desc())
+            .offset(offset)
+            .limit(limit + 1)
+        )
+        items = rows.mappings().all()
+        result["prompts"] = items[:limit]
+        result["prompts_has_more"] = len(items) > limit
+
+    if kind in ("all", "templates"):
+        score, cond = _ranked_query(Template, Template.name, q)
+        rows = await session.execute(
+            select(Template.id, Template.name, Template.description, Template.labels, Template.updated_at, score)
+            .where(cond)
+            .order_by(score.desc(), Template.updated_at.desc())
+            .offset(offset)
+            .limit(limit + 1)
+        )
+        items = rows.mappings().all()
+        result["templates"] = items[:limit]
+        result["templates_has_more"] = len(items) > limit
+
+    return result
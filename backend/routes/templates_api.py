@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 from sqlalchemy import select
 
-from db.session import get_session
+from db.session import db_session, read_session
 from db.models import Template
 
 router = APIRouter(prefix="/api/templates", tags=["templates"])
@@ -19,7 +19,7 @@ class TemplateCreate(BaseModel):
 
 
 @router.get("")
-async def list_templates(session=Depends(get_session)):
+async def list_templates(session=Depends(read_session)):
     result = await session.execute(
         select(Template).order_by(Template.updated_at.desc())
     )
@@ -28,7 +28,7 @@ async def list_templates(session=Depends(get_session)):
 
 
 @router.get("/{template_id}")
-async def get_template(template_id: uuid.UUID, session=Depends(get_session)):
+async def get_template(template_id: uuid.UUID, session=Depends(read_session)):
     tmpl = await session.get(Template, template_id)
     if not tmpl:
         raise HTTPException(status_code=404, detail="Template not found")
@@ -36,7 +36,7 @@ async def get_template(template_id: uuid.UUID, session=Depends(get_session)):
 
 
 @router.post("")
-async def create_template(payload: TemplateCreate, session=Depends(get_session)):
+async def create_template(payload: TemplateCreate, session=Depends(db_session)):
     tmpl = Template(
         name=payload.name,
         description=payload.description,
@@ -1,8 +1,18 @@
+import asyncio
 import json
 import logging
-from fastapi import APIRouter, HTTPException
+import time
+from contextlib import aclosing
+from typing import Mapping, Optional
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from services import grok_service_prompt, openai_service_prompt, gemini_service_prompt
+from config.settings import settings
+from services import get_service, upstream_scheduler, SchedulerTimeout
+from services.similarity_cache import similarity_cache, prompt_key, fields_key, is_enabled_for
+from services.stream_buffer import StreamBuffer, StreamExpired, stream_buffers
+from services.upstream_client import UpstreamNotConfigured
+from services.usage import usage_recorder
+from utils.profiling import PhaseTimer
 from utils import GrokAPIError
 from schemas import AiHubRequest, AiHubStreamHandshake, AiHubStreamChunk
 
@@ -14,28 +24,36 @@ router = APIRouter(prefix="/api/chat", tags=["chat-unified"])
 ai_hub_router = APIRouter(prefix="/api/ai_hub", tags=["ai-hub"])
 
 
-@ai_hub_router.post(
-    "/get_prompt_res_text",
-    response_class=StreamingResponse,
-    responses={
-        200: {
-            "description": "SSE stream: first event is handshake {req_id, result_code, result_msg}, followed by ai_output chunks.",
-            "content": {
-                "text/event-stream": {
-                    "example": """
-data: {"req_id":"abc-123","result_code":0,"result_msg":"ok"}
-
-data: {"ai_output":"안녕하세요"}
+async def stream_from_buffer(buffer: StreamBuffer, last_event_id: int):
+    """버퍼 -> SSE. handshake 다음 ai_output 이벤트마다 `id:` 로 시퀀스를 붙인다."""
+    handshake = await buffer.wait_handshake()
+    yield f"data: {json.dumps(handshake)}\n\n"
+    if handshake.get("result_code") != 0:
+        return
+    try:
+        async with aclosing(buffer.follow(last_event_id)) as events:
+            async for seq, payload in events:
+                yield f"id: {seq}\ndata: {payload}\n\n"
+    except StreamExpired as e:
+        expired = {"req_id": buffer.req_id, "result_code": 410, "result_msg": str(e)}
+        yield f"data: {json.dumps(expired)}\n\n"
+        return
+    if buffer.error:
+        # 기존과 동일하게 업스트림 오류는 연결 중단으로 전달
+        raise RuntimeError(buffer.error)
 
-data: {"ai_output":" 반갑습니다"}
 
-"""
-                }
-            },
-        }
-    },
-)
-async def get_prompt_res_text(request: AiHubRequest):
+def start_prompt_stream(
+    request: AiHubRequest,
+    headers: Mapping[str, str],
+    client_host: Optional[str],
+    timer: PhaseTimer,
+) -> tuple[StreamBuffer, dict]:
+    """
+    입력 렌더링 -> 프로바이더 선택 -> (근사 중복 캐시) -> 업스트림 생산 태스크 시작.
+    SSE/WebSocket 전송 계층이 공통으로 사용하며, 잘못된 입력은 HTTPException 으로 알린다.
+    반환값: (출력 버퍼, 응답 헤더)
+    """
     if not request.req_id or not str(request.req_id).strip():
         raise HTTPException(status_code=400, detail="req_id cannot be empty")
 
@@ -68,8 +86,10 @@ async def get_prompt_res_text(request: AiHubRequest):
         },
     )
 
+    form_values = None   # 폼 제출이면 실제로 렌더링된 {필드: 값} (유사도 캐시 정확 일치용)
     if ui_type == "form" or (request.user_input.form and not request.user_input.text):
         fields_text_parts = []
+        form_values = {}
         labels_by_name = {}
         template = getattr(request.user_input, "template", None)
 
@@ -87,6 +107,7 @@ async def get_prompt_res_text(request: AiHubRequest):
                 if value is None and isinstance(fields, dict) and name in fields:
                     value = fields.get(name)
                 fields_text_parts.append(f"{(label or name).strip()}: {'' if value is None else value}")
+                form_values[name] = value
 
         if not fields_text_parts:
             if not isinstance(fields, dict) or not fields:
@@ -97,6 +118,7 @@ async def get_prompt_res_text(request: AiHubRequest):
                 return labels_by_name.get(name, name.replace("_", " ").strip().title())
 
             fields_text_parts = [f"{_labelize(k)}: {v}" for k, v in fields.items()]
+            form_values = dict(fields)
 
         fields_text = "\n".join(fields_text_parts)
         message_text = f"[Form Submission]\n{fields_text}" if fields_text else "[Form Submission]"
@@ -122,58 +144,187 @@ async def get_prompt_res_text(request: AiHubRequest):
 
     if provider:
         if 'gpt' in provider or 'openai' in provider or 'o1' in provider:
-            service = openai_service_prompt
+            service = get_service("openai")
         elif 'gemini' in provider:
-            service = gemini_service_prompt
+            service = get_service("gemini")
         else:
-            service = grok_service_prompt
+            service = get_service("grok")
     else:
         if 'gpt' in version_lower or 'o1' in version_lower or 'openai' in version_lower:
-            service = openai_service_prompt
+            service = get_service("openai")
         elif 'gemini' in version_lower:
-            service = gemini_service_prompt
+            service = get_service("gemini")
         else:
-            service = grok_service_prompt
+            service = get_service("grok")
 
+    # 키가 없는 프로바이더는 스트림을 열기 전에 503 으로 알린다
     try:
-        async def generate():
-            def _hist_text(item):
-                if isinstance(item, dict):
-                    return item.get("text") or ""
-                return getattr(item, "text", "") or ""
-
-            history = [{"role": "user", "content": _hist_text(item)} for item in request.hist] if request.hist else []
-
-            # LLM 호출 직전, 텍스트로 정제된 메시지 로그
-            logger.info(
-                "[AIHub] LLM request ready",
-                extra={
-                    "req_id": request.req_id,
-                    "provider": request.model or request.version or "default",
-                    "model_version": request.version or "",
-                    "history_len": len(history),
-                    "message_preview": message_text[:500],
-                    "prompt_len": len(prompt_text or ""),
-                },
-            )
-            # 검증 성공 알림을 첫 SSE 이벤트로 전송
-            handshake = {
+        service.require_api_key()
+    except UpstreamNotConfigured as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # 공정 스케줄링: 헤더 우선, 없으면 요청 필드, 그래도 없으면 클라이언트 IP
+    priority = (headers.get("x-priority") or request.priority or "interactive").lower()
+    client_key = headers.get("x-client-key") or request.client_key or client_host
+
+    # 근사 중복 캐시: 프롬프트별 opt-in, 대화 이력이 없는 단발 요청만 대상.
+    # 클라이언트와 폼 필드 값은 정확히 일치해야 하고(scope), 퍼지 매칭은 나머지 텍스트에만 적용
+    cache_scope = None
+    cached_answer = None
+    response_headers = {}
+    pkey = prompt_key(request.prompt.id, prompt_text)
+    if not request.hist and is_enabled_for(pkey):
+        cache_scope = (
+            pkey,
+            prompt_key(None, prompt_text),
+            service.provider,
+            request.version or service.model,
+            client_key,
+            fields_key(form_values),
+        )
+        cached_answer, score = similarity_cache.lookup(cache_scope, message_text)
+        response_headers["X-Similarity-Cache"] = "hit" if cached_answer is not None else "miss"
+        response_headers["X-Similarity-Score"] = f"{score:.4f}"
+        logger.info(
+            "[AIHub] Similarity cache lookup",
+            extra={"req_id": request.req_id, "prompt_key": pkey, "score": score, "hit": cached_answer is not None},
+        )
+
+    timer.mark("render")
+
+    async def produce(buffer: StreamBuffer):
+        """업스트림 호출 -> 버퍼. 클라이언트 연결과 분리되어 있어 연결이 끊겨도 끝까지 진행된다."""
+        history = [{"role": item.role, "content": item.message} for item in request.hist]
+
+        # LLM 호출 직전, 텍스트로 정제된 메시지 로그
+        logger.info(
+            "[AIHub] LLM request ready",
+            extra={
                 "req_id": request.req_id,
-                "result_code": 0,
-                "result_msg": "ok",
-            }
-            yield f"data: {json.dumps(handshake)}\n\n"
-
-            async for chunk in service.stream_prompt_response(
-                message_text,
-                history,
-                model=request.model,
-                prompt_text=prompt_text,
-                model_version=request.version,
-                req_id=input_title or request.req_id,
-            ):
-                yield chunk
-
-        return StreamingResponse(generate(), media_type="text/event-stream")
+                "provider": request.model or request.version or "default",
+                "model_version": request.version or "",
+                "history_len": len(history),
+                "message_preview": message_text[:500],
+                "prompt_len": len(prompt_text or ""),
+            },
+        )
+        if cached_answer is not None:
+            buffer.set_handshake({"req_id": request.req_id, "result_code": 0, "result_msg": "ok"})
+            buffer.append(json.dumps({"ai_output": cached_answer}))
+            buffer.finish()
+            return
+
+        answer_parts = [] if cache_scope else None
+        usage = {}
+        dispatched_at = None
+        try:
+            async with upstream_scheduler.slot(service.provider, priority, client_key):
+                timer.mark("dispatch")
+                dispatched_at = time.perf_counter()
+                # 검증 성공(+업스트림 슬롯 확보) 알림을 첫 SSE 이벤트로 전송
+                buffer.set_handshake({
+                    "req_id": request.req_id,
+                    "result_code": 0,
+                    "result_msg": "ok",
+                })
+
+                async for chunk in service.stream_prompt_response(
+                    message_text,
+                    history,
+                    model=request.model,
+                    prompt_text=prompt_text,
+                    model_version=request.version,
+                    req_id=input_title or request.req_id,
+                    on_usage=usage.update,
+                ):
+                    if not buffer.last_seq:
+                        timer.mark("ttft")
+                    payload = chunk[len("data: "):].strip()
+                    if answer_parts is not None:
+                        answer_parts.append(json.loads(payload)["ai_output"])
+                    buffer.append(payload)
+                timer.mark("stream")
+            if answer_parts:
+                similarity_cache.store(cache_scope, message_text, "".join(answer_parts))
+            timer.record()
+            logger.info("[AIHub] Phase timings", extra={"req_id": request.req_id, "phases_ms": timer.phases})
+            buffer.finish()
+        except SchedulerTimeout as e:
+            logger.warning("[AIHub] Upstream busy", extra={"req_id": request.req_id, "priority": priority})
+            buffer.set_handshake({"req_id": request.req_id, "result_code": 503, "result_msg": str(e)})
+            buffer.finish()
+        except Exception as e:
+            logger.exception("[AIHub] Upstream stream failed", extra={"req_id": request.req_id})
+            buffer.finish(error=str(e))
+        finally:
+            # 실패/취소된 스트림도 업스트림이 보고한 사용량은 집계
+            if usage and settings.usage_enabled:
+                usage_recorder.record(
+                    service.provider,
+                    usage["model"],
+                    pkey,
+                    client_key,
+                    usage["prompt_tokens"],
+                    usage["completion_tokens"],
+                    time.perf_counter() - dispatched_at,
+                )
+
+    buffer = stream_buffers.create(request.req_id)
+    buffer.task = asyncio.create_task(produce(buffer))
+    return buffer, response_headers
+
+
+@ai_hub_router.post(
+    "/get_prompt_res_text",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "SSE stream: first event is handshake {req_id, result_code, result_msg, resume_token}, followed by ai_output chunks with sequential ids. Re-POST with Last-Event-ID and X-Resume-Token to resume.",
+            "content": {
+                "text/event-stream": {
+                    "example": """
+data: {"req_id":"abc-123","result_code":0,"result_msg":"ok","resume_token":"..."}
+
+id: 1
+data: {"ai_output":"안녕하세요"}
+
+id: 2
+data: {"ai_output":" 반갑습니다"}
+
+"""
+                }
+            },
+        }
+    },
+)
+async def get_prompt_res_text(request: AiHubRequest, http_request: Request):
+    # 단계별 타이밍: 요청 도착(ProfilingMiddleware) ~ 핸들러 진입 = 본문 파싱 + Pydantic 검증
+    timer = PhaseTimer(getattr(http_request.state, "received_at", None))
+    timer.mark("validate")
+    http_request.state.phase_timer = timer
+
+    # 재연결: Last-Event-ID 가 있으면 새 업스트림 호출 없이 버퍼에서 이어서 전송(최초 handshake 의 resume_token 필요)
+    last_event_id = http_request.headers.get("last-event-id")
+    if last_event_id is not None:
+        buffer = stream_buffers.get(request.req_id, http_request.headers.get("x-resume-token"))
+        if buffer is None:
+            raise HTTPException(status_code=410, detail="stream for req_id is no longer available")
+        try:
+            last_seq = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be an integer")
+        logger.info("[AIHub] Resume stream", extra={"req_id": request.req_id, "last_event_id": last_seq})
+        return StreamingResponse(stream_from_buffer(buffer, last_seq), media_type="text/event-stream")
+
+    try:
+        buffer, response_headers = start_prompt_stream(
+            request,
+            http_request.headers,
+            http_request.client.host if http_request.client else None,
+            timer,
+        )
+        return StreamingResponse(stream_from_buffer(buffer, 0), media_type="text/event-stream", headers=response_headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise GrokAPIError(detail=str(e))
@@ -0,0 +1,158 @@
+import time
+from datetime import datetime, timezone
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+
+from config.settings import settings
+from db.models import UsageRollup
+from db.session import get_session
+from services.usage import cost_of, usage_recorder
+from utils.admin import require_admin
+
+# client_key 는 IP 로 대체될 수 있으므로 관리자 전용
+router = APIRouter(prefix="/api/usage", tags=["usage"], dependencies=[Depends(require_admin)])
+
+BUCKET_SIZES = {"minute": 60, "hour": 3600, "day": 86400}
+GROUP_FIELDS = ("provider", "model", "prompt_key", "client_key")
+DEFAULT_WINDOW = 3600
+MAX_ROWS = 5000
+
+
+def _parse_group_by(group_by: str) -> list[str]:
+    fields = [f.strip() for f in group_by.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in GROUP_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"unknown group_by field(s): {unknown}; allowed: {list(GROUP_FIELDS)}")
+    # 비용 계산에 모델이 필요하므로 항상 model 단위까지는 나눠서 집계
+    return fields if "model" in fields else fields + ["model"]
+
+
+def _summarize(row: dict, bucket_seconds: int) -> dict:
+    requests = row["requests"]
+    prompt_tokens = row["prompt_tokens"]
+    completion_tokens = row["completion_tokens"]
+    total = prompt_tokens + completion_tokens
+    stream_seconds = row.pop("stream_seconds")
+    row.update({
+        "total_tokens": total,
+        "tokens_per_request": round(total / requests, 1) if requests else 0.0,
+        # 구간 평균 처리량(용량 계획용) / 스트리밍 중 생성 속도(모델 성능)
+        "tokens_per_sec": round(total / bucket_seconds, 3),
+        "completion_tokens_per_stream_sec": round(completion_tokens / stream_seconds, 1) if stream_seconds else None,
+        "cost_usd": cost_of(row["model"], prompt_tokens, completion_tokens),
+    })
+    return row
+
+
+async def _query_db(since: float, until: float, bucket_seconds: int, fields: list[str]) -> list[dict]:
+    bucket = func.to_timestamp(
+        func.floor(func.extract("epoch", UsageRollup.bucket_start) / bucket_seconds) * bucket_seconds
+    ).label("bucket")
+    group_cols = [getattr(UsageRollup, f) for f in fields]
+    stmt = (
+        select(
+            bucket,
+            *group_cols,
+            func.sum(UsageRollup.requests).label("requests"),
+            func.sum(UsageRollup.prompt_tokens).label("prompt_tokens"),
+            func.sum(UsageRollup.completion_tokens).label("completion_tokens"),
+            func.sum(UsageRollup.stream_seconds).label("stream_seconds"),
+        )
+        .where(
+            UsageRollup.bucket_start >= datetime.fromtimestamp(since, tz=timezone.utc),
+            UsageRollup.bucket_start < datetime.fromtimestamp(until, tz=timezone.utc),
+        )
+        .group_by(bucket, *group_cols)
+        .order_by(bucket)
+        .limit(MAX_ROWS)
+    )
+    async with get_session(readonly=True) as session:
+        rows = (await session.execute(stmt)).mappings().all()
+    return [
+        {
+            **dict(r),
+            "bucket": r["bucket"].isoformat(),
+            "requests": int(r["requests"]),
+            "prompt_tokens": int(r["prompt_tokens"]),
+            "completion_tokens": int(r["completion_tokens"]),
+            "stream_seconds": float(r["stream_seconds"]),
+        }
+        for r in rows
+    ]
+
+
+def _query_memory(since: float, until: float, bucket_seconds: int, fields: list[str]) -> list[dict]:
+    grouped: dict[tuple, dict] = {}
+    for key, (requests, prompt_tokens, completion_tokens, stream_seconds) in usage_recorder.recent(since, until).items():
+        labels = dict(zip(GROUP_FIELDS, key[1:]))
+        gkey = (key[0] // bucket_seconds * bucket_seconds, *(labels[f] for f in fields))
+        row = grouped.get(gkey)
+        if row is None:
+            row = grouped[gkey] = {
+                "bucket": datetime.fromtimestamp(gkey[0], tz=timezone.utc).isoformat(),
+                **{f: labels[f] for f in fields},
+                "requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "stream_seconds": 0.0,
+            }
+        row["requests"] += requests
+        row["prompt_tokens"] += prompt_tokens
+        row["completion_tokens"] += completion_tokens
+        row["stream_seconds"] += stream_seconds
+    return [grouped[k] for k in sorted(grouped)][:MAX_ROWS]
+
+
+@router.get("")
+async def usage(
+    since: Optional[datetime] = Query(None, description="시작 시각(ISO 8601), 기본: until - 1시간"),
+    until: Optional[datetime] = Query(None, description="종료 시각(ISO 8601, 미포함), 기본: 현재"),
+    bucket: Literal["minute", "hour", "day"] = "hour",
+    group_by: str = Query("provider,model", description=f"콤마 구분: {', '.join(GROUP_FIELDS)}"),
+    source: Literal["auto", "db", "memory"] = "auto",
+):
+    """
+    토큰 사용량 시계열. 버킷별 요청 수, 입력/출력 토큰, 요청당 토큰, 초당 토큰, 비용(USAGE_PRICING 기준)을 반환한다.
+    DB(usage_rollups)는 flush 주기(usage_flush_interval)만큼 늦게 반영되며, memory 는 이 워커의 최근 구간만 포함한다.
+    """
+    fields = _parse_group_by(group_by)
+    until_ts = until.timestamp() if until else time.time()
+    since_ts = since.timestamp() if since else until_ts - DEFAULT_WINDOW
+    if since_ts >= until_ts:
+        raise HTTPException(status_code=422, detail="since must be earlier than until")
+    bucket_seconds = BUCKET_SIZES[bucket]
+
+    if source == "auto":
+        source = "db" if settings.database_url else "memory"
+    if source == "db":
+        if not settings.database_url:
+            raise HTTPException(status_code=503, detail="DATABASE_URL not set; use source=memory")
+        rows = await _query_db(since_ts, until_ts, bucket_seconds, fields)
+    else:
+        rows = _query_memory(since_ts, until_ts, bucket_seconds, fields)
+
+    series = [_summarize(row, bucket_seconds) for row in rows]
+    totals = _summarize(
+        {
+            "model": "",
+            "requests": sum(r["requests"] for r in series),
+            "prompt_tokens": sum(r["prompt_tokens"] for r in series),
+            "completion_tokens": sum(r["completion_tokens"] for r in series),
+            "stream_seconds": 0.0,
+        },
+        max(1, int(until_ts - since_ts)),
+    )
+    totals.pop("model")
+    totals.pop("completion_tokens_per_stream_sec")
+    costs = [r["cost_usd"] for r in series if r["cost_usd"] is not None]
+    totals["cost_usd"] = round(sum(costs), 6) if costs else None
+
+    return {
+        "source": source,
+        "since": datetime.fromtimestamp(since_ts, tz=timezone.utc).isoformat(),
+        "until": datetime.fromtimestamp(until_ts, tz=timezone.utc).isoformat(),
+        "bucket": bucket,
+        "group_by": fields,
+        "totals": totals,
+        "series": series,
+        "truncated": len(series) >= MAX_ROWS,
+    }
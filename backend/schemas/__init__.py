@@ -1,4 +1,7 @@
 from .ai_hub import (
+    HistoryItem,
+    FormTemplateField,
+    FormTemplate,
     UserInput,
     Prompt,
     AiHubRequest,
@@ -10,6 +13,9 @@ from .ai_hub import (
 )
 
 __all__ = [
+    "HistoryItem",
+    "FormTemplateField",
+    "FormTemplate",
     "UserInput",
     "Prompt",
     "AiHubRequest",
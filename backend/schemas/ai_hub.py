@@ -1,18 +1,93 @@
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Any, List, Literal, Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from config.settings import settings
+
+
+def _check_form(form: Optional[dict]) -> Optional[dict]:
+  if form is None:
+    return form
+  if len(form) > settings.max_form_fields:
+    raise ValueError(f"form has too many fields (max {settings.max_form_fields})")
+  for key, value in form.items():
+    if len(str(key)) > settings.max_form_value_chars or len(str(value)) > settings.max_form_value_chars:
+      raise ValueError(f"form field '{str(key)[:50]}' is too long (max {settings.max_form_value_chars} chars)")
+  return form
+
+
+def _form_chars(form: Optional[dict]) -> int:
+  if not form:
+    return 0
+  return sum(len(str(key)) + len(str(value)) for key, value in form.items())
+
+
+class HistoryItem(BaseModel):
+  role: Literal["user", "assistant"] = "user"
+  content: Optional[str] = Field(None, max_length=settings.max_hist_item_chars)
+  text: Optional[str] = Field(None, max_length=settings.max_hist_item_chars)  # 구 클라이언트 호환
+
+  @property
+  def message(self) -> str:
+    return self.content or self.text or ""
+
+
+class FormTemplateField(BaseModel):
+  id: Optional[str] = None
+  name: Optional[str] = Field(None, max_length=200)
+  label: Optional[str] = Field(None, max_length=200)
+  type: Optional[str] = None
+  value: Any = None
+
+  @field_validator("value")
+  @classmethod
+  def _value_len(cls, v):
+    if v is not None and len(str(v)) > settings.max_form_value_chars:
+      raise ValueError(f"field value is too long (max {settings.max_form_value_chars} chars)")
+    return v
+
+
+class FormTemplate(BaseModel):
+  id: Optional[str] = None
+  name: Optional[str] = None
+  description: Optional[str] = None
+  fields: List[FormTemplateField] = Field(default_factory=list, max_length=settings.max_form_fields)
+
 
 class UserInput(BaseModel):
   id: Optional[str] = None
   title: Optional[str] = None
   type: Optional[str] = "text"  # text | form
-  text: Optional[str] = None
+  text: Optional[str] = Field(None, max_length=settings.max_input_chars)
   form: Optional[dict] = None
+  template: Optional[FormTemplate] = None
+
+  @field_validator("form")
+  @classmethod
+  def _form_limits(cls, v):
+    return _check_form(v)
 
 
 class Prompt(BaseModel):
   id: Optional[str] = None
   title: Optional[str] = None
-  text: Optional[str] = None
+  text: Optional[str] = Field(None, max_length=settings.max_input_chars)
+
+
+def _is_form(user_input: UserInput) -> bool:
+  return (user_input.type or "text").lower() == "form" or bool(user_input.form and not user_input.text)
+
+
+def _form_input_chars(user_input: UserInput) -> int:
+  """폼 제출이 프롬프트 본문에 렌더링되는 분량. 템플릿 필드가 있으면 그것만, 없으면 form dict."""
+  form = user_input.form or {}
+  named = [f for f in user_input.template.fields if f.name is not None] if user_input.template else []
+  if not named:
+    return _form_chars(form)
+  total = 0
+  for f in named:
+    value = form.get(f.name) if f.value is None else f.value
+    total += len(f.label or f.name) + len("" if value is None else str(value))
+  return total
 
 
 class AiHubRequest(BaseModel):
@@ -20,8 +95,19 @@ class AiHubRequest(BaseModel):
   model: Optional[str] = None
   version: Optional[str] = None
   prompt: Prompt
-  hist: List = []
+  hist: List[HistoryItem] = Field(default_factory=list, max_length=settings.max_hist_items)
   user_input: UserInput
+  client_key: Optional[str] = Field(None, max_length=200)   # 공정 스케줄링 키(X-Client-Key 헤더 우선)
+  priority: Optional[Literal["interactive", "background"]] = None  # X-Priority 헤더 우선, 기본 interactive
+
+  @model_validator(mode="after")
+  def _total_chars(self):
+    total = sum(len(item.message) for item in self.hist) + len(self.prompt.text or "")
+    # start_prompt_stream 과 같은 분기: 폼이면 렌더링될 필드만 세고 user_input.text(폼 JSON 사본)는 제외
+    total += _form_input_chars(self.user_input) if _is_form(self.user_input) else len(self.user_input.text or "")
+    if total > settings.max_total_chars:
+      raise ValueError(f"request is too large ({total} chars, max {settings.max_total_chars})")
+    return self
 
 
 class AiHubResponse(BaseModel):
@@ -32,6 +118,7 @@ class AiHubStreamHandshake(BaseModel):
   req_id: str
   result_code: int
   result_msg: str
+  resume_token: Optional[str] = None  # 재연결(X-Resume-Token / WS resume) 시 필요, 성공 handshake 에만 포함
 
 
 class AiHubStreamChunk(BaseModel):
@@ -44,11 +131,16 @@ class FormUserInput(BaseModel):
   fields: dict
   user_agent: Optional[str] = None
 
+  @field_validator("fields")
+  @classmethod
+  def _fields_limits(cls, v):
+    return _check_form(v)
+
 
 class FormRequest(BaseModel):
   req_id: Optional[str] = None
   model: Optional[str] = None
   version: Optional[str] = None
   prompt: Prompt
-  hist: List = []
+  hist: List[HistoryItem] = Field(default_factory=list, max_length=settings.max_hist_items)
   user_input: FormUserInput
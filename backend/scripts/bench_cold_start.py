@@ -0,0 +1,87 @@
+"""
+콜드 스타트 벤치마크.
+
+1) `import main` 소요 시간(별도 인터프리터에서 N회 측정)
+2) uvicorn 멀티 워커 기동 ~ 첫 요청 성공(/api/health/check)까지의 시간
+3) 기동 ~ 준비 완료(/api/health/ready 200)까지의 시간
+
+사용법 (backend 디렉터리에서):
+    python scripts/bench_cold_start.py --workers 4 --runs 3
+    PREWARM_ENABLED=true python scripts/bench_cold_start.py --workers 4
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(runs: int) -> dict:
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]) * 1000)
+    return {"runs": runs, "median_ms": round(statistics.median(samples), 1), "max_ms": round(max(samples), 1)}
+
+
+def _poll(url: str, deadline: float) -> float | None:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def measure_server(workers: int, port: int, timeout: float) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        deadline = started + timeout
+        first = _poll(f"http://127.0.0.1:{port}/api/health/check", deadline)
+        ready = _poll(f"http://127.0.0.1:{port}/api/health/ready", deadline)
+        return {
+            "workers": workers,
+            "time_to_first_request_ms": round((first - started) * 1000, 1) if first else None,
+            "time_to_ready_ms": round((ready - started) * 1000, 1) if ready else None,
+        }
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    result = {
+        "prewarm": os.environ.get("PREWARM_ENABLED", "false"),
+        "import": measure_import(args.runs),
+        "server": [measure_server(args.workers, args.port, args.timeout) for _ in range(args.runs)],
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,26 @@
-from .grok_service_prompt import grok_service_prompt
-from .openai_service_prompt import openai_service_prompt
-from .gemini_service_prompt import gemini_service_prompt
+from .registry import get_service, close_services
+from .scheduler import upstream_scheduler, SchedulerTimeout
+
+_LAZY_ADAPTERS = {
+    "grok_service_prompt": "grok",
+    "openai_service_prompt": "openai",
+    "gemini_service_prompt": "gemini",
+}
+
+
+def __getattr__(name):
+    # 기존 `from services import grok_service_prompt` 호환: 접근 시점에 어댑터를 생성
+    if name in _LAZY_ADAPTERS:
+        return get_service(_LAZY_ADAPTERS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "grok_service_prompt",
     "openai_service_prompt",
     "gemini_service_prompt",
+    "get_service",
+    "close_services",
+    "upstream_scheduler",
+    "SchedulerTimeout",
 ]
@@ -0,0 +1,224 @@
+import asyncio
+import base64
+import gzip
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from typing import Optional
+
+import httpx
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 카세트에 남기지 않을 헤더/쿼리 파라미터
+REDACTED_HEADERS = {"authorization", "x-api-key", "x-goog-api-key", "cookie", "set-cookie"}
+REDACTED_PARAMS = {"key", "api_key", "access_token"}
+REDACTED = "[REDACTED]"
+_BEARER_RE = re.compile(r"(Bearer\s+)[A-Za-z0-9._\-]+")
+
+
+def _redact_url(url: httpx.URL) -> str:
+    params = [(k, REDACTED if k.lower() in REDACTED_PARAMS else v) for k, v in url.params.multi_items()]
+    return str(url.copy_with(params=params))
+
+
+def _redact_headers(headers: httpx.Headers) -> list:
+    return [[k, REDACTED if k.lower() in REDACTED_HEADERS else v] for k, v in headers.multi_items()]
+
+
+def _redact_text(text: str) -> str:
+    text = _BEARER_RE.sub(r"\1" + REDACTED, text)
+    for secret in (settings.grok_api_key, settings.openai_api_key, settings.gemini_api_key):
+        if secret:
+            text = text.replace(secret, REDACTED)
+    return text
+
+
+def request_key(body: bytes) -> str:
+    """요청 본문(JSON 이면 정규화) 해시: 재생 시 같은 요청의 카세트를 찾는 데 사용."""
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False).encode()
+    except (ValueError, UnicodeDecodeError):
+        pass
+    return hashlib.sha256(body).hexdigest()
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """업스트림 원본 바이트를 그대로 흘려보내면서, 청크별 도착 시각(ms)과 함께 기록한다."""
+
+    def __init__(self, inner: httpx.AsyncByteStream, cassette: dict, path: str):
+        self._inner = inner
+        self._cassette = cassette
+        self._path = path
+        self._t0 = time.monotonic()
+
+    async def __aiter__(self):
+        async for chunk in self._inner:
+            offset_ms = round((time.monotonic() - self._t0) * 1000, 1)
+            self._cassette["chunks"].append([offset_ms, base64.b64encode(chunk).decode()])
+            yield chunk
+
+    async def aclose(self):
+        await self._inner.aclose()
+        self._cassette["duration_ms"] = round((time.monotonic() - self._t0) * 1000, 1)
+        try:
+            # 파일 쓰기는 이벤트 루프를 막지 않도록 스레드에서
+            await asyncio.to_thread(_write_cassette, self._path, self._cassette)
+        except OSError as e:
+            logger.warning("[Cassette] write failed", extra={"path": self._path, "error": str(e)})
+
+
+def _write_cassette(path: str, cassette: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(cassette, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """실제 업스트림 호출을 수행하고 응답 스트림을 카세트(.json.gz)로 저장한다."""
+
+    def __init__(self, provider: str, cassette_dir: str):
+        self.provider = provider
+        self.cassette_dir = cassette_dir
+        self._inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        started_at = time.time()
+        response = await self._inner.handle_async_request(request)
+        cassette = {
+            "version": 1,
+            "provider": self.provider,
+            "recorded_at": started_at,
+            "request": {
+                "method": request.method,
+                "url": _redact_url(request.url),
+                "headers": _redact_headers(request.headers),
+                "key": request_key(body),
+                "body": _redact_text(body.decode("utf-8", errors="replace")),
+            },
+            "status": response.status_code,
+            "headers": _redact_headers(response.headers),
+            "chunks": [],
+        }
+        name = f"{int(started_at * 1000)}-{uuid.uuid4().hex[:8]}.json.gz"
+        path = os.path.join(self.cassette_dir, self.provider, name)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, cassette, path),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        # 내부 커넥션 풀을 닫고 캐시에서 빼서, 클라이언트를 다시 만들면 새 transport 를 쓰게 한다
+        if _transports.get(self.provider) is self:
+            del _transports[self.provider]
+        await self._inner.aclose()
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    """기록된 청크를 원래 간격(/speed)대로 다시 흘려보낸다. speed <= 0 이면 대기 없이 즉시."""
+
+    def __init__(self, chunks: list, speed: float):
+        self._chunks = chunks
+        self._speed = speed
+
+    async def __aiter__(self):
+        t0 = time.monotonic()
+        for offset_ms, data in self._chunks:
+            if self._speed > 0:
+                delay = offset_ms / 1000 / self._speed - (time.monotonic() - t0)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield base64.b64decode(data)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    네트워크 없이 카세트를 재생한다.
+    요청 본문 해시가 같은 카세트가 있으면 그것을, 없으면 해당 프로바이더 카세트를 순환하며 사용한다.
+    """
+
+    def __init__(self, provider: str, cassette_dir: str, speed: float):
+        self.provider = provider
+        self.cassette_dir = cassette_dir
+        self.speed = speed
+        self._by_key: dict[str, list] = {}
+        self._all: list = []
+        self._cycle = None
+        self._loaded = False
+        self._load_lock: Optional[asyncio.Lock] = None
+
+    def _load(self) -> list:
+        cassettes = []
+        directory = os.path.join(self.cassette_dir, self.provider)
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(".json.gz"):
+                    continue
+                with gzip.open(os.path.join(directory, name), "rt", encoding="utf-8") as f:
+                    cassettes.append(json.load(f))
+        return cassettes
+
+    async def load(self):
+        """카세트 읽기/압축 해제는 이벤트 루프를 막지 않도록 스레드에서 한 번만 수행."""
+        if self._loaded:
+            return
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self._loaded:
+                return
+            for cassette in await asyncio.to_thread(self._load):
+                self._all.append(cassette)
+                self._by_key.setdefault(cassette["request"]["key"], []).append(cassette)
+            self._cycle = itertools.cycle(self._all) if self._all else None
+            self._loaded = True
+        logger.info("[Cassette] replay loaded", extra={"provider": self.provider, "count": len(self._all)})
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self.load()
+        body = await request.aread()
+        matches = self._by_key.get(request_key(body))
+        if matches:
+            cassette = matches[0]
+        elif self._cycle is not None:
+            cassette = next(self._cycle)
+        else:
+            raise httpx.ConnectError(f"no cassette recorded for provider '{self.provider}'", request=request)
+        return httpx.Response(
+            status_code=cassette["status"],
+            headers=[(k, v) for k, v in cassette["headers"]],
+            stream=_ReplayStream(cassette["chunks"], self.speed),
+            request=request,
+        )
+
+
+_transports: dict[str, httpx.AsyncBaseTransport] = {}
+
+
+def upstream_transport(provider: str) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    UPSTREAM_CASSETTE_MODE 에 따른 httpx transport. 비활성이면 None(기본 transport 사용).
+    """
+    mode = (settings.upstream_cassette_mode or "").lower()
+    if mode not in ("record", "replay"):
+        return None
+    transport = _transports.get(provider)
+    if transport is None:
+        if mode == "record":
+            transport = RecordingTransport(provider, settings.upstream_cassette_dir)
+        else:
+            transport = ReplayTransport(provider, settings.upstream_cassette_dir, settings.upstream_replay_speed)
+        _transports[provider] = transport
+    return transport
@@ -1,21 +1,31 @@
-import httpx
 import json
 import logging
 from config.settings import settings
+from services.upstream_client import UpstreamClientMixin
 
 logger = logging.getLogger(__name__)
 
+# Gemini contents 는 user/model 역할만 허용
+_GEMINI_ROLES = {"assistant": "model", "model": "model"}
+
+
+class GeminiServicePrompt(UpstreamClientMixin):
+    provider = "gemini"
 
-class GeminiServicePrompt:
     def __init__(self):
         self.api_key = settings.gemini_api_key
         self.base_url = settings.gemini_api_base_url
         self.model = settings.gemini_model
 
-    async def stream_prompt_response(self, user_input_text: str, history: list = None, model: str = None, prompt_text: str = "", model_version: str | None = None, req_id: str | None = None):
+    def warm_request(self):
+        return f"{self.base_url}/models", {"key": self.api_key}, {}
+
+    async def stream_prompt_response(self, user_input_text: str, history: list = None, model: str = None, prompt_text: str = "", model_version: str | None = None, req_id: str | None = None, on_usage=None):
         """
         Gemini Native API에 프롬프트/입력을 보내고 스트림 응답을 반환합니다.
+        on_usage 가 주어지면 스트림 종료 시 마지막 usageMetadata(누적값)를 dict 로 전달합니다.
         """
+        self.require_api_key()
         prompt_text = prompt_text or ""
         use_model = model_version if model_version else self.model
 
@@ -30,7 +40,7 @@ class GeminiServicePrompt:
             for item in history:
                 role = item.get("role") if isinstance(item, dict) else getattr(item, "role", "user")
                 text = item.get("content") if isinstance(item, dict) else getattr(item, "content", "")
-                msg = _to_gemini_message(role or "user", text or "")
+                msg = _to_gemini_message(_GEMINI_ROLES.get(role, "user"), text or "")
                 if msg:
                     contents.append(msg)
 
@@ -55,45 +65,61 @@ class GeminiServicePrompt:
         params = {"key": self.api_key, "alt": "sse"}
         headers = {"Content-Type": "application/json"}
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            async with client.stream(
-                "POST",
-                endpoint,
-                params=params,
-                json=payload,
-                headers=headers,
-            ) as response:
-                if response.status_code != 200:
-                    body = await response.aread()
-                    raise Exception(f"Gemini API Error {response.status_code}: {body.decode(errors='ignore')}")
-
-                async for line in response.aiter_lines():
-                    if not line:
+        usage_metadata = None
+        model_version_seen = None
+        client = self.http_client()
+        async with client.stream(
+            "POST",
+            endpoint,
+            params=params,
+            json=payload,
+            headers=headers,
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise Exception(f"Gemini API Error {response.status_code}: {body.decode(errors='ignore')}")
+
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                if line.startswith("data:"):
+                    data_str = line.split("data:", 1)[1].strip()
+                    if data_str in ("[DONE]", ""):
+                        continue
+                    try:
+                        data = json.loads(data_str)
+                    except json.JSONDecodeError:
+                        continue
+
+                    # usageMetadata 는 청크마다 누적값으로 오므로 마지막 값만 사용
+                    if data.get("usageMetadata"):
+                        usage_metadata = data["usageMetadata"]
+                    # 실제 응답 모델(modelVersion)은 usageMetadata 가 아니라 응답 최상위에 온다
+                    if data.get("modelVersion"):
+                        model_version_seen = data["modelVersion"]
+
+                    candidates = data.get("candidates") or []
+                    if not candidates:
                         continue
-                    if line.startswith("data:"):
-                        data_str = line.split("data:", 1)[1].strip()
-                        if data_str in ("[DONE]", ""):
-                            continue
-                        try:
-                            data = json.loads(data_str)
-                        except json.JSONDecodeError:
-                            continue
-
-                        candidates = data.get("candidates") or []
-                        if not candidates:
-                            continue
-
-                        # Stream delta 또는 전체 content 모두 처리
-                        content_obj = candidates[0].get("content") or {}
-                        delta_obj = candidates[0].get("delta", {}).get("content", {})
-                        parts = (content_obj.get("parts") or []) + (delta_obj.get("parts") or [])
-
-                        for part in parts:
-                            text = part.get("text") if isinstance(part, dict) else None
-                            if text:
-                                yield f"data: {json.dumps({'ai_output': text})}\n\n"
-                    # Ignore other event types
-                # Stream close -> nothing to do
+
+                    # Stream delta 또는 전체 content 모두 처리
+                    content_obj = candidates[0].get("content") or {}
+                    delta_obj = candidates[0].get("delta", {}).get("content", {})
+                    parts = (content_obj.get("parts") or []) + (delta_obj.get("parts") or [])
+
+                    for part in parts:
+                        text = part.get("text") if isinstance(part, dict) else None
+                        if text:
+                            yield f"data: {json.dumps({'ai_output': text})}\n\n"
+                # Ignore other event types
+            # Stream close -> 사용량 보고
+            if usage_metadata and on_usage:
+                on_usage({
+                    "model": model_version_seen or use_model,
+                    "prompt_tokens": usage_metadata.get("promptTokenCount") or 0,
+                    "completion_tokens": (usage_metadata.get("candidatesTokenCount") or 0)
+                    + (usage_metadata.get("thoughtsTokenCount") or 0),
+                })
 
 
 gemini_service_prompt = GeminiServicePrompt()
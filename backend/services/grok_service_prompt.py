@@ -1,21 +1,25 @@
-import httpx
 import json
 import logging
 from config.settings import settings
+from services.upstream_client import UpstreamClientMixin
 
 logger = logging.getLogger(__name__)
 
 
-class GrokServicePrompt:
+class GrokServicePrompt(UpstreamClientMixin):
+    provider = "grok"
+
     def __init__(self):
         self.api_key = settings.grok_api_key
         self.base_url = settings.grok_api_base_url
         self.model = settings.grok_model
 
-    async def stream_prompt_response(self, user_input_text: str, history: list = None, model: str = None, prompt_text: str = "", model_version: str | None = None, req_id: str | None = None):
+    async def stream_prompt_response(self, user_input_text: str, history: list = None, model: str = None, prompt_text: str = "", model_version: str | None = None, req_id: str | None = None, on_usage=None):
         """
         Grok Native API(x.ai)로 프롬프트/입력을 보내고 스트림 응답을 반환합니다.
+        on_usage 가 주어지면 마지막 이벤트의 토큰 사용량을 dict 로 전달합니다.
         """
+        self.require_api_key()
         prompt_text = prompt_text or ""
 
         headers = {
@@ -44,44 +48,53 @@ class GrokServicePrompt:
             "model": use_model,
             "messages": messages,
             "stream": True,
+            "stream_options": {"include_usage": True},
         }
 
         endpoint = f"{self.base_url}/chat/completions"
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            async with client.stream(
-                "POST",
-                endpoint,
-                json=payload,
-                headers=headers,
-            ) as response:
-                if response.status_code != 200:
-                    body = await response.aread()
-                    raise Exception(f"Grok API Error {response.status_code}: {body.decode(errors='ignore')}")
-
-                async for line in response.aiter_lines():
-                    if not line:
+        client = self.http_client()
+        async with client.stream(
+            "POST",
+            endpoint,
+            json=payload,
+            headers=headers,
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise Exception(f"Grok API Error {response.status_code}: {body.decode(errors='ignore')}")
+
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                if line.startswith("data:"):
+                    data_str = line.split("data:", 1)[1].strip()
+                    if data_str == "[DONE]":
+                        break
+                    try:
+                        data = json.loads(data_str)
+                    except json.JSONDecodeError:
+                        continue
+
+                    usage = data.get("usage")
+                    if usage and on_usage:
+                        on_usage({
+                            "model": data.get("model") or use_model,
+                            "prompt_tokens": usage.get("prompt_tokens") or 0,
+                            "completion_tokens": usage.get("completion_tokens") or 0,
+                        })
+
+                    choices = data.get("choices") or []
+                    if not choices:
                         continue
-                    if line.startswith("data:"):
-                        data_str = line.split("data:", 1)[1].strip()
-                        if data_str == "[DONE]":
-                            break
-                        try:
-                            data = json.loads(data_str)
-                        except json.JSONDecodeError:
-                            continue
-
-                        choices = data.get("choices") or []
-                        if not choices:
-                            continue
-
-                        delta = choices[0].get("delta", {}) or {}
-                        content = delta.get("content") or ""
-                        if isinstance(content, list):
-                            content = "".join([c.get("text", "") if isinstance(c, dict) else str(c) for c in content])
-
-                        if content:
-                            yield f"data: {json.dumps({'ai_output': content})}\n\n"
+
+                    delta = choices[0].get("delta", {}) or {}
+                    content = delta.get("content") or ""
+                    if isinstance(content, list):
+                        content = "".join([c.get("text", "") if isinstance(c, dict) else str(c) for c in content])
+
+                    if content:
+                        yield f"data: {json.dumps({'ai_output': content})}\n\n"
 
 
 grok_service_prompt = GrokServicePrompt()
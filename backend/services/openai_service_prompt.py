@@ -1,22 +1,26 @@
-import httpx
 import json
 import logging
 from config.settings import settings
+from services.upstream_client import UpstreamClientMixin
 from services.prompts.prompts import PROMPTS
 
 logger = logging.getLogger(__name__)
 
 
-class OpenAIServicePrompt:
+class OpenAIServicePrompt(UpstreamClientMixin):
+    provider = "openai"
+
     def __init__(self):
         self.api_key = settings.openai_api_key
         self.base_url = settings.openai_api_base_url
         self.model = settings.openai_model
 
-    async def stream_prompt_response(self, user_input_text: str, history: list = None, model: str = None, prompt_text: str = "", model_version: str | None = None, req_id: str | None = None):
+    async def stream_prompt_response(self, user_input_text: str, history: list = None, model: str = None, prompt_text: str = "", model_version: str | None = None, req_id: str | None = None, on_usage=None):
         """
         OpenAI API에 프롬프트/입력을 보내고 스트림 응답을 반환합니다.
+        on_usage 가 주어지면 마지막 이벤트의 토큰 사용량을 dict 로 전달합니다.
         """
+        self.require_api_key()
         prompt_text = prompt_text or ""
         logger.info(
             "[Service] stream_prompt_response",
@@ -46,36 +50,45 @@ class OpenAIServicePrompt:
             "model": use_model,
             "messages": messages,
             "stream": True,
+            "stream_options": {"include_usage": True},
         }
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/chat/completions",
-                json=payload,
-                headers=headers,
-            ) as response:
-                if response.status_code != 200:
-                    raise Exception(
-                        f"OpenAI API Error {response.status_code}: {await response.aread().decode()}"
-                    )
+        client = self.http_client()
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            json=payload,
+            headers=headers,
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(
+                    f"OpenAI API Error {response.status_code}: {await response.aread().decode()}"
+                )
 
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data_str = line[6:]
-                        if data_str == "[DONE]":
-                            break
-                        try:
-                            data = json.loads(data_str)
-                            if "choices" in data and len(data["choices"]) > 0:
-                                delta = data["choices"][0].get("delta", {})
-                                content = delta.get("content", "")
-                                if content:
-                                    # JSON으로 감싸 개행이 이스케이프된 상태로 단일 SSE 라인에 실어 보낸다
-                                    payload = json.dumps({"ai_output": content})
-                                    yield f"data: {payload}\n\n"
-                        except json.JSONDecodeError:
-                            continue
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    data_str = line[6:]
+                    if data_str == "[DONE]":
+                        break
+                    try:
+                        data = json.loads(data_str)
+                        # include_usage: choices 가 빈 마지막 이벤트에 usage 가 실려 온다
+                        usage = data.get("usage")
+                        if usage and on_usage:
+                            on_usage({
+                                "model": data.get("model") or use_model,
+                                "prompt_tokens": usage.get("prompt_tokens") or 0,
+                                "completion_tokens": usage.get("completion_tokens") or 0,
+                            })
+                        if "choices" in data and len(data["choices"]) > 0:
+                            delta = data["choices"][0].get("delta", {})
+                            content = delta.get("content", "")
+                            if content:
+                                # JSON으로 감싸 개행이 이스케이프된 상태로 단일 SSE 라인에 실어 보낸다
+                                payload = json.dumps({"ai_output": content})
+                                yield f"data: {payload}\n\n"
+                    except json.JSONDecodeError:
+                        continue
 
 
 openai_service_prompt = OpenAIServicePrompt()
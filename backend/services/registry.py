@@ -0,0 +1,36 @@
+import importlib
+import sys
+
+# provider -> (모듈, 어댑터 인스턴스 이름). 모듈은 처음 사용할 때 import 된다.
+_PROVIDERS = {
+    "grok": ("services.grok_service_prompt", "grok_service_prompt"),
+    "openai": ("services.openai_service_prompt", "openai_service_prompt"),
+    "gemini": ("services.gemini_service_prompt", "gemini_service_prompt"),
+}
+
+_instances: dict = {}
+
+
+def get_service(provider: str):
+    """프로바이더 어댑터를 지연 생성하여 반환한다."""
+    service = _instances.get(provider)
+    if service is None:
+        module_name, attr = _PROVIDERS[provider]
+        service = getattr(importlib.import_module(module_name), attr)
+        # 서브모듈 import 가 패키지 속성(services.<attr>)을 모듈 객체로 덮어쓰므로, 기존처럼 인스턴스를 가리키게 되돌림
+        setattr(sys.modules["services"], attr, service)
+        _instances[provider] = service
+    return service
+
+
+def loaded_services() -> dict:
+    return dict(_instances)
+
+
+def all_providers() -> list[str]:
+    return list(_PROVIDERS)
+
+
+async def close_services():
+    for service in list(_instances.values()):
+        await service.aclose()
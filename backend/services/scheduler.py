@@ -0,0 +1,195 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ("interactive", "background")
+
+
+class SchedulerTimeout(Exception):
+    """업스트림 슬롯 대기 시간이 초과됨."""
+
+
+class _Waiter:
+    __slots__ = ("future", "client", "enqueued_at")
+
+    def __init__(self, client: str):
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.client = client
+        self.enqueued_at = time.monotonic()
+
+
+class _ClassQueue:
+    """
+    우선순위 클래스 하나의 대기열: 클라이언트 키 단위 start-time fair queuing.
+    각 요청 태그 = max(가상시각, 해당 클라이언트의 마지막 태그) + 1 이므로,
+    한 클라이언트가 몰아서 넣은 요청은 다른 클라이언트 요청들과 번갈아 처리된다.
+    """
+
+    def __init__(self, weight: int):
+        self.weight = weight
+        self.pass_value = 0.0   # 클래스 간 stride 스케줄링용
+        self.vtime = 0.0
+        self.last_tag: dict[str, float] = {}
+        self.heap: list = []
+        self.in_flight = 0
+        self.waits = deque(maxlen=1000)
+        self.dispatched = 0
+        self.timeouts = 0
+
+    def push(self, waiter: _Waiter, seq: int):
+        tag = max(self.vtime, self.last_tag.get(waiter.client, 0.0)) + 1.0
+        self.last_tag[waiter.client] = tag
+        heapq.heappush(self.heap, (tag, seq, waiter))
+
+    def pop(self) -> Optional[_Waiter]:
+        while self.heap:
+            tag, _, waiter = heapq.heappop(self.heap)
+            if waiter.future.done():  # 취소/타임아웃된 대기자
+                continue
+            self.vtime = tag
+            # 뒤처진 클라이언트 기록은 정리하여 메모리를 제한
+            if len(self.last_tag) > 1024:
+                self.last_tag = {k: v for k, v in self.last_tag.items() if v > self.vtime}
+            return waiter
+        return None
+
+    def depth(self) -> int:
+        return sum(1 for _, _, w in self.heap if not w.future.done())
+
+
+class _ProviderScheduler:
+    """
+    프로바이더 하나의 동시 스트림 수를 제한하고, 빈 슬롯을 우선순위 클래스 간 가중치(stride)로 배분한다.
+    background 는 전체 슬롯 중 일정 비율까지만 점유할 수 있어 interactive 용 여유가 항상 남는다.
+    """
+
+    def __init__(self, name: str, capacity: int, background_share: float, weights: dict[str, int]):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.background_cap = max(1, int(self.capacity * background_share))
+        self.in_flight = 0
+        self.classes = {p: _ClassQueue(weights[p]) for p in PRIORITIES}
+        self._seq = itertools.count()
+
+    def _can_run(self, priority: str) -> bool:
+        if self.in_flight >= self.capacity:
+            return False
+        if priority == "background" and self.classes["background"].in_flight >= self.background_cap:
+            return False
+        return True
+
+    def _dispatch(self):
+        while self.in_flight < self.capacity:
+            candidates = [
+                (q.pass_value, p) for p, q in self.classes.items()
+                if q.heap and self._can_run(p)
+            ]
+            if not candidates:
+                return
+            _, priority = min(candidates)
+            queue = self.classes[priority]
+            waiter = queue.pop()
+            if waiter is None:
+                continue
+            queue.pass_value += 1.0 / queue.weight
+            self._grant(priority, waiter)
+
+    def _grant(self, priority: str, waiter: _Waiter):
+        queue = self.classes[priority]
+        self.in_flight += 1
+        queue.in_flight += 1
+        queue.dispatched += 1
+        queue.waits.append(time.monotonic() - waiter.enqueued_at)
+        waiter.future.set_result(None)
+
+    def release(self, priority: str):
+        self.in_flight -= 1
+        self.classes[priority].in_flight -= 1
+        self._dispatch()
+
+    async def acquire(self, priority: str, client: str, timeout: Optional[float]):
+        queue = self.classes[priority]
+        waiter = _Waiter(client)
+        if not queue.heap:
+            # 쉬고 있던 클래스가 밀린 몫을 몰아서 가져가지 않도록 pass 값을 활성 클래스의 최소값에 맞춤
+            active = [q.pass_value for q in self.classes.values() if q.heap]
+            if active:
+                queue.pass_value = max(queue.pass_value, min(active))
+        queue.push(waiter, next(self._seq))
+        self._dispatch()
+        if waiter.future.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 슬롯을 받은 직후 취소된 경우 반납
+                self.release(priority)
+            else:
+                waiter.future.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                queue.timeouts += 1
+                raise SchedulerTimeout(f"{self.name} upstream busy ({priority})") from None
+            raise
+
+    def stats(self) -> dict:
+        out = {"capacity": self.capacity, "background_cap": self.background_cap, "in_flight": self.in_flight}
+        for p, q in self.classes.items():
+            waits = sorted(q.waits)
+            out[p] = {
+                "queue_depth": q.depth(),
+                "in_flight": q.in_flight,
+                "dispatched": q.dispatched,
+                "timeouts": q.timeouts,
+                "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                "wait_ms_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 2) if waits else 0.0,
+                "wait_ms_max": round(waits[-1] * 1000, 2) if waits else 0.0,
+            }
+        return out
+
+
+class UpstreamScheduler:
+    """프로바이더 어댑터 앞단의 공정 스케줄러(프로바이더별 인스턴스를 지연 생성)."""
+
+    def __init__(self):
+        self._providers: dict[str, _ProviderScheduler] = {}
+
+    def _get(self, provider: str) -> _ProviderScheduler:
+        sched = self._providers.get(provider)
+        if sched is None:
+            sched = _ProviderScheduler(
+                provider,
+                settings.upstream_max_concurrency,
+                settings.upstream_background_max_share,
+                {
+                    "interactive": settings.scheduler_interactive_weight,
+                    "background": settings.scheduler_background_weight,
+                },
+            )
+            self._providers[provider] = sched
+        return sched
+
+    @asynccontextmanager
+    async def slot(self, provider: str, priority: str = "interactive", client_key: Optional[str] = None) -> AsyncIterator[None]:
+        priority = priority if priority in PRIORITIES else "interactive"
+        sched = self._get(provider)
+        await sched.acquire(priority, client_key or "anonymous", settings.scheduler_queue_timeout)
+        try:
+            yield
+        finally:
+            sched.release(priority)
+
+    def stats(self) -> dict:
+        return {name: s.stats() for name, s in self._providers.items()}
+
+
+upstream_scheduler = UpstreamScheduler()
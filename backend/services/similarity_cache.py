@@ -0,0 +1,213 @@
+import hashlib
+import itertools
+import logging
+import re
+import unicodedata
+from array import array
+from collections import OrderedDict, deque
+from typing import Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MINHASH_BINS = 64                  # one-permutation MinHash: 셰이글마다 해시 1회, 64개 bin 의 최솟값
+LSH_BANDS = 16                     # 4 bin x 16 밴드: Jaccard 0.9 이상이면 사실상 항상 후보로 잡힘
+BAND_ROWS = MINHASH_BINS // LSH_BANDS
+SHINGLE_SIZE = 3                   # 문자 3-gram (한국어처럼 띄어쓰기가 불규칙한 텍스트에도 동작)
+_EMPTY = (1 << 64) - 1             # 비어 있는 bin
+_HASH_MASK = (1 << 64) - 1
+_ENTRY_OVERHEAD = 200              # 엔트리/인덱스 객체 고정 비용 근사(bytes)
+
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """유니코드 정규화 + 소문자 + 구두점 제거 + 공백 축약."""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def shingles(text: str) -> set[str]:
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(features: set[str]) -> array:
+    """
+    one-permutation MinHash 서명(64 x uint64). 해시는 프로세스 내 캐시 전용이므로 내장 hash() 를 쓴다
+    (PYTHONHASHSEED 에 따라 프로세스마다 달라지지만 서명을 프로세스 밖으로 내보내지 않음).
+    """
+    mins = [_EMPTY] * MINHASH_BINS
+    for f in features:
+        h = hash(f) & _HASH_MASK
+        b = h % MINHASH_BINS
+        if h < mins[b]:
+            mins[b] = h
+    return array("Q", mins)
+
+
+def estimate_jaccard(a: array, b: array) -> float:
+    """두 서명의 Jaccard 추정치: 일치하는 bin 수 / 둘 중 하나라도 채워진 bin 수."""
+    matched = filled = 0
+    for x, y in zip(a, b):
+        if x == _EMPTY and y == _EMPTY:
+            continue
+        filled += 1
+        if x == y:
+            matched += 1
+    return matched / filled if filled else 1.0
+
+
+def prompt_key(prompt_id: Optional[str], prompt_text: str) -> str:
+    """프롬프트 식별자: id 가 있으면 id, 없으면 본문 해시."""
+    if prompt_id:
+        return prompt_id
+    return hashlib.sha256((prompt_text or "").encode()).hexdigest()[:16]
+
+
+def fields_key(values: Optional[dict]) -> str:
+    """
+    폼 필드 값의 정확 일치 키(정규화 후 해시). 폼 값은 한 글자만 달라도 다른 질문이므로
+    (주문번호 A-1024 vs A-1025) 퍼지 매칭 대상이 아니라 캐시 범위(scope)에 넣는다.
+    """
+    if not values:
+        return ""
+    pairs = sorted((normalize(str(k)), normalize("" if v is None else str(v))) for k, v in values.items())
+    canonical = "\x1f".join(f"{k}\x1e{v}" for k, v in pairs)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+class _Entry:
+    __slots__ = ("scope", "signature", "answer", "size")
+
+    def __init__(self, scope: tuple, signature: array, answer: str):
+        self.scope = scope
+        self.signature = signature
+        self.answer = answer
+        self.size = len(answer.encode()) + signature.itemsize * len(signature) + _ENTRY_OVERHEAD
+
+
+class SimilarityCache:
+    """
+    (프롬프트 키, 모델, 클라이언트, 폼 필드 값) 범위의 근사 중복 응답 캐시. 퍼지 매칭은 범위 안의 자유 텍스트에만 적용된다.
+
+    엔트리에는 입력 원문 대신 64 bin MinHash 서명만 보관한다. 서명을 밴드로 쪼갠 LSH 인덱스로 후보를 찾고,
+    후보마다 서명으로 Jaccard 유사도를 추정해 임계값 이상일 때만 저장된 응답을 돌려준다.
+    메모리는 엔트리 수와 바이트(응답 + 서명) 상한 두 가지로 LRU 제한된다.
+    입력이 similarity_cache_max_text_chars 를 넘으면 해싱 비용 때문에 캐시 대상에서 제외한다.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._bands: dict[tuple, set[int]] = {}
+        self._ids = itertools.count()
+        self.stats = {
+            "lookups": 0, "hits": 0, "shadow_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "skipped_too_long": 0,
+        }
+        self.recent_scores = deque(maxlen=500)
+
+    @staticmethod
+    def _band_keys(scope: tuple, signature: array):
+        for band in range(LSH_BANDS):
+            start = band * BAND_ROWS
+            rows = tuple(signature[start:start + BAND_ROWS])
+            # 짧은 입력은 빈 bin 이 많아, 전부 빈 밴드는 서로 무관한 입력끼리 묶이므로 색인하지 않음
+            if rows.count(_EMPTY) < BAND_ROWS:
+                yield (scope, band, rows)
+
+    @staticmethod
+    def _signature(text: str) -> Optional[array]:
+        if len(text) > settings.similarity_cache_max_text_chars:
+            return None
+        return minhash(shingles(normalize(text)))
+
+    def lookup(self, scope: tuple, text: str) -> tuple[Optional[str], float]:
+        """가장 유사한 엔트리의 (응답, 유사도). 임계값 미만이면 응답은 None."""
+        self.stats["lookups"] += 1
+        signature = self._signature(text)
+        if signature is None:
+            self.stats["skipped_too_long"] += 1
+            self.stats["misses"] += 1
+            return None, 0.0
+
+        candidates = set()
+        for key in self._band_keys(scope, signature):
+            candidates |= self._bands.get(key, set())
+
+        best_id, best_score = None, 0.0
+        for entry_id in candidates:
+            score = estimate_jaccard(signature, self._entries[entry_id].signature)
+            if score > best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is not None:
+            self.recent_scores.append(round(best_score, 4))
+        if best_id is None or best_score < settings.similarity_cache_threshold:
+            self.stats["misses"] += 1
+            return None, best_score
+
+        if settings.similarity_cache_shadow:
+            # 섀도 모드: 점수만 기록하고 응답은 제공하지 않음(임계값 튜닝용)
+            self.stats["shadow_hits"] += 1
+            return None, best_score
+
+        self._entries.move_to_end(best_id)
+        self.stats["hits"] += 1
+        return self._entries[best_id].answer, best_score
+
+    def _evict_oldest(self):
+        old_id, old = self._entries.popitem(last=False)
+        self.bytes -= old.size
+        for key in self._band_keys(old.scope, old.signature):
+            bucket = self._bands.get(key)
+            if bucket is not None:
+                bucket.discard(old_id)
+                if not bucket:
+                    del self._bands[key]
+        self.stats["evictions"] += 1
+
+    def store(self, scope: tuple, text: str, answer: str):
+        if not answer:
+            return
+        signature = self._signature(text)
+        if signature is None:
+            return
+        entry = _Entry(scope, signature, answer)
+        if entry.size > self.max_bytes:
+            return
+        entry_id = next(self._ids)
+        self._entries[entry_id] = entry
+        self.bytes += entry.size
+        for key in self._band_keys(scope, signature):
+            self._bands.setdefault(key, set()).add(entry_id)
+        self.stats["stores"] += 1
+
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._evict_oldest()
+
+    def get_stats(self) -> dict:
+        scores = sorted(self.recent_scores)
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "threshold": settings.similarity_cache_threshold,
+            "shadow": settings.similarity_cache_shadow,
+            "score_p50": scores[len(scores) // 2] if scores else None,
+            "score_p90": scores[min(len(scores) - 1, int(len(scores) * 0.9))] if scores else None,
+        }
+
+
+def is_enabled_for(key: str) -> bool:
+    enabled = {p.strip() for p in (settings.similarity_cache_prompts or "").split(",") if p.strip()}
+    return key in enabled
+
+
+similarity_cache = SimilarityCache(settings.similarity_cache_max_entries, settings.similarity_cache_max_bytes)
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StreamExpired(Exception):
+    """요청한 Last-Event-ID 이후 구간이 더 이상 버퍼에 없음."""
+
+
+class StreamBuffer:
+    """
+    req_id 하나의 SSE 출력 버퍼. 업스트림 생산자(백그라운드 태스크)가 이벤트를 쌓고,
+    클라이언트 연결(최초/재연결)은 원하는 시퀀스부터 읽어 간다.
+
+    이벤트 시퀀스는 1부터 시작하며, 메모리 상한을 넘으면 앞쪽 이벤트부터 버린다(base 이동).
+    재연결은 handshake 로 발급한 resume_token 을 가진 클라이언트만 가능하다.
+    읽는 쪽이 하나도 없는 상태가 stream_abandon_grace 초 이어지면 생산 태스크를 취소한다.
+    """
+
+    def __init__(self, req_id: str):
+        self.req_id = req_id
+        self.resume_token = secrets.token_urlsafe(24)
+        self.readers = 0
+        self._idle_timer: Optional[asyncio.TimerHandle] = None
+        self.handshake: Optional[dict] = None
+        self.events: list[str] = []
+        self.base = 0            # events[0] 의 시퀀스 - 1
+        self.size = 0
+        self.done = False
+        self.error: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @property
+    def last_seq(self) -> int:
+        return self.base + len(self.events)
+
+    def set_handshake(self, handshake: dict):
+        if handshake.get("result_code") == 0:
+            handshake = {**handshake, "resume_token": self.resume_token}
+        self.handshake = handshake
+        self._notify()
+
+    def arm_idle_timer(self):
+        """읽는 쪽이 없으면 유예 시간 뒤 버려진 스트림인지 확인한다."""
+        grace = settings.stream_abandon_grace
+        if grace <= 0 or self.done or self.readers or self._idle_timer is not None:
+            return
+        self._idle_timer = asyncio.get_running_loop().call_later(grace, self._check_abandoned)
+
+    def _check_abandoned(self):
+        self._idle_timer = None
+        if self.done or self.readers:
+            return
+        logger.info("[StreamBuffer] No reader attached, cancelling upstream", extra={"req_id": self.req_id})
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        self.finish(error="abandoned: no reader attached")
+
+    def _attach(self):
+        self.readers += 1
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _detach(self):
+        self.readers -= 1
+        self.arm_idle_timer()
+
+    def append(self, payload: str):
+        self.events.append(payload)
+        self.size += len(payload)
+        while self.size > settings.stream_buffer_max_bytes and len(self.events) > 1:
+            self.size -= len(self.events.pop(0))
+            self.base += 1
+        self._notify()
+
+    def finish(self, error: Optional[str] = None):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        self.done = True
+        self.error = error
+        self.finished_at = time.monotonic()
+        self._notify()
+
+    async def wait_handshake(self) -> dict:
+        self._attach()
+        try:
+            while self.handshake is None and not self.done:
+                await self._changed.wait()
+        finally:
+            self._detach()
+        return self.handshake or {"req_id": self.req_id, "result_code": 500, "result_msg": self.error or "stream failed"}
+
+    async def follow(self, after: int = 0) -> AsyncIterator[tuple[int, str]]:
+        """시퀀스 after 다음 이벤트부터 (seq, payload) 를 내보내고, 생산이 끝날 때까지 대기한다."""
+        if after < self.base:
+            raise StreamExpired(f"events before {self.base + 1} are no longer buffered")
+        seq = after
+        self._attach()
+        try:
+            while True:
+                while seq < self.last_seq:
+                    if seq < self.base:
+                        raise StreamExpired(f"events before {self.base + 1} are no longer buffered")
+                    seq += 1
+                    yield seq, self.events[seq - self.base - 1]
+                if self.done:
+                    return
+                await self._changed.wait()
+        finally:
+            self._detach()
+
+
+class StreamBufferRegistry:
+    """
+    진행 중/최근 완료된 스트림 버퍼 저장소. 완료 후 TTL 이 지나거나 개수 상한을 넘으면 정리한다.
+
+    키는 서버가 발급한 resume_token 이다. req_id 는 클라이언트가 정하는 값(Date.now() 등)이라
+    서로 다른 사용자끼리 겹칠 수 있으므로, 같은 req_id 의 스트림이 여러 개 공존해도 된다.
+    """
+
+    def __init__(self):
+        self._buffers: OrderedDict[str, StreamBuffer] = OrderedDict()
+
+    def _purge(self):
+        now = time.monotonic()
+        for key in list(self._buffers):
+            buf = self._buffers[key]
+            if buf.done and now - buf.finished_at > settings.stream_buffer_ttl:
+                del self._buffers[key]
+        # 개수 상한: 오래된 완료 버퍼부터 제거(진행 중 버퍼는 유지)
+        overflow = len(self._buffers) - settings.stream_buffer_max_streams
+        for key in list(self._buffers):
+            if overflow <= 0:
+                break
+            if self._buffers[key].done:
+                del self._buffers[key]
+                overflow -= 1
+
+    def create(self, req_id: str) -> StreamBuffer:
+        """새 버퍼 등록(resume_token 으로 색인)."""
+        self._purge()
+        buf = StreamBuffer(req_id)
+        self._buffers[buf.resume_token] = buf
+        buf.arm_idle_timer()
+        return buf
+
+    def get(self, req_id: str, resume_token: Optional[str]) -> Optional[StreamBuffer]:
+        """resume_token 으로 찾은 버퍼가 같은 req_id 일 때만 반환(없거나 불일치면 None - 존재 여부도 드러내지 않음)."""
+        self._purge()
+        buf = self._buffers.get(resume_token) if resume_token else None
+        if buf is None or buf.req_id != req_id:
+            return None
+        return buf
+
+    def stats(self) -> dict:
+        live = sum(1 for b in self._buffers.values() if not b.done)
+        return {
+            "streams": len(self._buffers),
+            "live": live,
+            "unattached": sum(1 for b in self._buffers.values() if not b.done and not b.readers),
+            "bytes": sum(b.size for b in self._buffers.values()),
+        }
+
+
+stream_buffers = StreamBufferRegistry()
@@ -0,0 +1,56 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from config.settings import settings
+from services.cassette import upstream_transport
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamNotConfigured(RuntimeError):
+    """프로바이더 API 키가 설정되지 않음."""
+
+
+class UpstreamClientMixin:
+    """
+    프로바이더 어댑터 공용: 요청마다 새 AsyncClient(=새 TCP/TLS 연결)를 만들지 않고
+    어댑터별 커넥션 풀을 재사용한다. 클라이언트는 첫 사용 시 생성된다.
+    """
+
+    provider: str
+    base_url: str
+    api_key: Optional[str]
+    _http: Optional[httpx.AsyncClient] = None
+
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=30.0, transport=upstream_transport(self.provider))
+        return self._http
+
+    def require_api_key(self):
+        """
+        키 없이 'Bearer None' 같은 요청을 보내지 않도록 첫 사용 시점에 명확히 실패한다.
+        replay 모드는 카세트가 응답하므로(요청 본문으로 매칭) 키 없이도 허용한다.
+        """
+        if not self.api_key and (settings.upstream_cassette_mode or "").lower() != "replay":
+            raise UpstreamNotConfigured(f"{self.provider.upper()}_API_KEY is not set; {self.provider} provider is unavailable")
+
+    def warm_request(self) -> tuple[str, dict, dict]:
+        """pre-warm 용 가벼운 요청 (url, params, headers). 기본은 OpenAI 호환 GET /models."""
+        return f"{self.base_url}/models", {}, {"Authorization": f"Bearer {self.api_key}"}
+
+    async def warm(self) -> bool:
+        """커넥션 풀에 연결을 미리 열어 둔다. API 키가 없으면 건너뛴다."""
+        if not self.api_key:
+            return False
+        url, params, headers = self.warm_request()
+        response = await self.http_client().get(url, params=params, headers=headers)
+        await response.aclose()
+        return True
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert
+
+from config.settings import settings
+from db.models import UsageRollup
+from db.session import get_session
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 60
+WRITE_CHUNK_ROWS = 1000   # INSERT 한 문장의 바인드 파라미터 수 상한(32767) 아래로 유지
+
+# 버킷 값 인덱스: [requests, prompt_tokens, completion_tokens, stream_seconds]
+_REQUESTS, _PROMPT, _COMPLETION, _SECONDS = range(4)
+
+
+def _merge(target: dict, source: dict):
+    for key, values in source.items():
+        row = target.get(key)
+        if row is None:
+            target[key] = list(values)
+        else:
+            for i, v in enumerate(values):
+                row[i] += v
+
+
+def price_for(model: str) -> Optional[list[float]]:
+    """usage_pricing 에서 모델명과 가장 길게 일치하는 접두사의 [입력, 출력] 단가."""
+    best = None
+    for prefix, price in settings.usage_pricing.items():
+        if model.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return settings.usage_pricing[best] if best is not None else None
+
+
+def cost_of(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    price = price_for(model)
+    if price is None:
+        return None
+    return round((prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000, 8)
+
+
+class UsageRecorder:
+    """
+    업스트림 토큰 사용량을 (분 버킷, provider, model, prompt_key, client_key) 로 집계한다.
+
+    record() 는 이벤트 루프 스레드에서만 호출되므로 잠금 없이 dict 를 갱신하고,
+    flush 는 dict 참조를 새 dict 로 바꿔치기한 뒤 이전 dict 를 한 번에 DB 에 upsert 한다.
+    DB 가 없거나 쓰기에 실패하면 보관 기간(usage_retention_minutes) 동안 메모리에 남긴다.
+    """
+
+    def __init__(self):
+        self._pending: dict[tuple, list] = {}
+        self._recent: dict[tuple, list] = {}   # 최근 구간(조회/DB 미설정 대비), 보관 기간 지나면 삭제
+        self._retry: dict[tuple, list] = {}    # DB 쓰기 실패분, 다음 주기에 재시도
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.flushed_rows = 0
+        self.flush_errors = 0
+        self.last_flush_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        prompt_key: str,
+        client_key: Optional[str],
+        prompt_tokens: int,
+        completion_tokens: int,
+        stream_seconds: float,
+    ):
+        bucket = int(time.time()) // BUCKET_SECONDS * BUCKET_SECONDS
+        key = (bucket, provider, model or "", prompt_key or "", client_key or "")
+        row = self._pending.get(key)
+        if row is None:
+            self._pending[key] = [1, prompt_tokens, completion_tokens, stream_seconds]
+        else:
+            row[_REQUESTS] += 1
+            row[_PROMPT] += prompt_tokens
+            row[_COMPLETION] += completion_tokens
+            row[_SECONDS] += stream_seconds
+        self.recorded += 1
+
+    def _prune(self, buckets: dict):
+        cutoff = time.time() - settings.usage_retention_minutes * 60
+        for key in [k for k in buckets if k[0] < cutoff]:
+            del buckets[key]
+
+    async def _write(self, batch: dict):
+        table = UsageRollup.__table__
+        rows = [
+            {
+                "bucket_start": datetime.fromtimestamp(key[0], tz=timezone.utc),
+                "provider": key[1],
+                "model": key[2],
+                "prompt_key": key[3],
+                "client_key": key[4],
+                "requests": values[_REQUESTS],
+                "prompt_tokens": values[_PROMPT],
+                "completion_tokens": values[_COMPLETION],
+                "stream_seconds": values[_SECONDS],
+            }
+            for key, values in batch.items()
+        ]
+        # 한 트랜잭션 안에서 청크 단위 upsert: 같은 키가 이미 있으면 누적치를 더한다
+        async with get_session() as session:
+            for i in range(0, len(rows), WRITE_CHUNK_ROWS):
+                stmt = insert(UsageRollup).values(rows[i:i + WRITE_CHUNK_ROWS])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[c.name for c in table.primary_key.columns],
+                    set_={
+                        name: table.c[name] + stmt.excluded[name]
+                        for name in ("requests", "prompt_tokens", "completion_tokens", "stream_seconds")
+                    },
+                )
+                await session.execute(stmt)
+
+    async def flush(self) -> int:
+        """대기 중인 버킷(+이전 실패분)을 DB 에 일괄 반영. 반영한 행 수를 반환."""
+        batch, self._pending = self._pending, {}
+        _merge(self._recent, batch)
+        self._prune(self._recent)
+        if not settings.database_url:
+            return 0
+        # 이전 주기에 실패한 배치는 이미 _recent 에 반영돼 있으므로 쓰기 대상에만 합친다
+        _merge(self._retry, batch)
+        self._prune(self._retry)
+        batch, self._retry = self._retry, {}
+        if not batch:
+            return 0
+        try:
+            await self._write(batch)
+        except Exception as e:
+            _merge(self._retry, batch)
+            self.flush_errors += 1
+            self.last_error = str(e)
+            logger.warning("[Usage] Rollup flush failed", extra={"rows": len(batch), "error": str(e)})
+            return 0
+        self.flushed_rows += len(batch)
+        self.last_flush_at = time.time()
+        return len(batch)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.usage_flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def recent(self, since: float, until: float) -> dict[tuple, list]:
+        """메모리에 남아 있는 구간(flush 전 포함)의 버킷 사본."""
+        out: dict[tuple, list] = {}
+        for source in (self._recent, self._pending):
+            _merge(out, {k: v for k, v in source.items() if since <= k[0] < until})
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.usage_enabled,
+            "recorded": self.recorded,
+            "pending_buckets": len(self._pending),
+            "retry_buckets": len(self._retry),
+            "recent_buckets": len(self._recent),
+            "flushed_rows": self.flushed_rows,
+            "flush_errors": self.flush_errors,
+            "last_flush_at": self.last_flush_at,
+            "last_error": self.last_error,
+        }
+
+
+usage_recorder = UsageRecorder()
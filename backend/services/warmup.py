@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from config.settings import settings
+from db.session import prewarm_engine
+from services.registry import all_providers, get_service
+
+logger = logging.getLogger(__name__)
+
+RETRY_MAX_DELAY = 30.0
+
+# 프로세스 준비 상태: /api/health/ready 가 참조 (ready 이고 errors 가 비어 있을 때만 200)
+readiness = {
+    "ready": False,
+    "prewarm": settings.prewarm_enabled,
+    "started_at": time.time(),
+    "ready_at": None,
+    "attempts": 0,
+    "warmup_ms": {},
+    "errors": {},
+}
+
+_task: Optional[asyncio.Task] = None
+
+
+async def _timed(name: str, coro) -> bool:
+    started = time.perf_counter()
+    try:
+        await coro
+        readiness["warmup_ms"][name] = round((time.perf_counter() - started) * 1000, 1)
+        readiness["errors"].pop(name, None)
+        return True
+    except Exception as e:
+        readiness["errors"][name] = str(e)
+        logger.warning("[Warmup] %s failed", name, extra={"error": str(e)})
+        return False
+
+
+def _targets() -> dict:
+    """pre-warm 대상 이름 -> 코루틴 팩토리."""
+    targets = {}
+    for provider in all_providers():
+        service = get_service(provider)
+        if service.api_key:
+            targets[f"upstream:{provider}"] = service.warm
+    if settings.database_url:
+        targets["db"] = lambda: prewarm_engine(settings.db_prewarm_connections)
+    return targets
+
+
+async def prewarm():
+    """
+    업스트림 커넥션 풀과 DB 풀을 병렬로 미리 연다.
+    실패한 대상은 backoff 하며 성공할 때까지 다시 시도하고, 그동안 /ready 는 503 을 돌려준다.
+    """
+    started = time.perf_counter()
+    pending = _targets()
+    delay = 1.0
+    while True:
+        readiness["attempts"] += 1
+        names = list(pending)
+        results = await asyncio.gather(*(_timed(name, pending[name]()) for name in names))
+        pending = {name: pending[name] for name, ok in zip(names, results) if not ok}
+        if not pending:
+            break
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, RETRY_MAX_DELAY)
+    readiness["warmup_ms"]["total"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _mark_ready():
+    readiness["ready"] = True
+    readiness["ready_at"] = time.time()
+    logger.info("[Warmup] Worker ready", extra={"warmup_ms": readiness["warmup_ms"]})
+
+
+async def _prewarm_then_ready():
+    await prewarm()
+    _mark_ready()
+
+
+def start_warmup():
+    """
+    lifespan 시작 시 호출. pre-warm 은 요청 수신과 병렬로 백그라운드에서 진행한다
+    (uvicorn 은 lifespan 시작이 끝나야 연결을 받으므로, 여기서 기다리면 /ready 가 항상 200 이 된다).
+    """
+    global _task
+    if not settings.prewarm_enabled:
+        _mark_ready()
+        return
+    _task = asyncio.create_task(_prewarm_then_ready())
+
+
+async def stop_warmup():
+    global _task
+    if _task is not None and not _task.done():
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+    _task = None
+
+
+def is_ready() -> bool:
+    return readiness["ready"] and not readiness["errors"]
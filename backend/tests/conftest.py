@@ -0,0 +1,91 @@
+import json
+import os
+import sys
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+# backend 디렉터리를 import 경로에 추가 (main.py 와 같은 방식으로 `from services import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def anyio_backend():
+    # 비동기 테스트는 anyio 플러그인(@pytest.mark.anyio)으로 asyncio 위에서만 실행
+    return "asyncio"
+
+
+class MockUpstream:
+    """
+    프로바이더 SSE 응답을 흉내 내는 httpx MockTransport 핸들러.
+    events 를 `data: {json}` 로 보낸 뒤 done 이면 [DONE], error 가 있으면 그 예외로 연결을 끊는다.
+    받은 요청은 requests 에 남는다(페이로드 검증용).
+    """
+
+    def __init__(self, events: list[dict], done: bool = True, error: Exception | None = None):
+        self.events = events
+        self.done = done
+        self.error = error
+        self.requests: list[httpx.Request] = []
+
+    @property
+    def payloads(self) -> list[dict]:
+        return [json.loads(r.content) for r in self.requests]
+
+    async def _body(self):
+        for event in self.events:
+            yield f"data: {json.dumps(event)}\n\n".encode()
+        if self.done:
+            yield b"data: [DONE]\n\n"
+        if self.error is not None:
+            raise self.error
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        stream = _AsyncBody(self._body())
+        return httpx.Response(200, stream=stream, headers={"content-type": "text/event-stream"})
+
+
+class _AsyncBody(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    async def __aiter__(self):
+        async for chunk in self._chunks:
+            yield chunk
+
+
+@pytest.fixture
+def mock_upstream(monkeypatch):
+    """
+    mock_upstream(events, provider="openai", ...) -> (TestClient, MockUpstream)
+    프로바이더 어댑터의 API 키와 HTTP 클라이언트를 바꿔 끼우고 앱을 lifespan 과 함께 띄운다.
+    """
+    import main
+    from services import get_service
+
+    clients = []
+
+    def start(events: list[dict], provider: str = "openai", **kwargs):
+        upstream = MockUpstream(events, **kwargs)
+        service = get_service(provider)
+        monkeypatch.setattr(service, "api_key", "test-key")
+        monkeypatch.setattr(service, "_http", httpx.AsyncClient(transport=httpx.MockTransport(upstream)))
+        if not clients:
+            clients.append(TestClient(main.app).__enter__())
+        return clients[0], upstream
+
+    yield start
+    for client in clients:
+        client.__exit__(None, None, None)
+
+
+def openai_chunks(*words: str) -> list[dict]:
+    """OpenAI 호환(openai/grok) 스트림 델타 이벤트 목록."""
+    return [{"choices": [{"delta": {"content": word}}]} for word in words]
+
+
+def sse_events(text: str) -> list[dict]:
+    """SSE 응답 본문의 data: 줄을 JSON 으로."""
+    return [json.loads(line[len("data: "):]) for line in text.splitlines() if line.startswith("data: ")]
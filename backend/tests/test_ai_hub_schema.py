@@ -0,0 +1,38 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from config.settings import settings
+from schemas.ai_hub import AiHubRequest
+
+
+def _form_request(form: dict) -> dict:
+    # 프론트엔드는 폼 제출 시 text 에 JSON.stringify(form), template.fields[].value 에도 같은 값을 담아 보낸다
+    return {
+        "prompt": {"text": ""},
+        "user_input": {
+            "type": "form",
+            "text": json.dumps(form),
+            "form": form,
+            "template": {"fields": [{"name": k, "label": k, "value": v} for k, v in form.items()]},
+        },
+    }
+
+
+def test_form_values_are_counted_once(monkeypatch):
+    monkeypatch.setattr(settings, "max_total_chars", 1000)
+    form = {"a": "x" * 400, "b": "y" * 400}   # 렌더링 분량 ~802자, 세 번 세면 2400자 이상
+
+    AiHubRequest.model_validate(_form_request(form))
+
+    form["c"] = "z" * 300
+    with pytest.raises(ValidationError, match="too large"):
+        AiHubRequest.model_validate(_form_request(form))
+
+
+def test_text_input_counts_text(monkeypatch):
+    monkeypatch.setattr(settings, "max_total_chars", 100)
+    body = {"prompt": {"text": "p" * 50}, "user_input": {"type": "text", "text": "t" * 51}}
+    with pytest.raises(ValidationError, match="too large"):
+        AiHubRequest.model_validate(body)
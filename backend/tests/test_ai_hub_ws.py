@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from config.settings import settings
+from conftest import openai_chunks
+
+
+@pytest.fixture
+def client(mock_upstream, monkeypatch):
+    monkeypatch.setattr(settings, "ws_stream_window", 64)
+    client, _ = mock_upstream(openai_chunks("하나", "둘", "셋"))
+    return client
+
+
+def _start(req_id: str) -> dict:
+    return {
+        "type": "start",
+        "request": {"req_id": req_id, "model": "gpt-4o", "prompt": {"text": ""}, "user_input": {"type": "text", "text": "hi"}},
+    }
+
+
+def _receive_until_end(ws, req_id: str) -> list[dict]:
+    messages = []
+    while True:
+        message = ws.receive_json()
+        assert message["req_id"] == req_id
+        messages.append(message)
+        if message["type"] in ("end", "error"):
+            return messages
+
+
+def test_start_streams_chunks_and_resume_requires_token(client):
+    with client.websocket_connect("/api/ai_hub/ws") as ws:
+        ws.send_json(_start("ws-1"))
+        messages = _receive_until_end(ws, "ws-1")
+    handshake, *chunks, end = messages
+    assert handshake["type"] == "handshake" and handshake["result_code"] == 0
+    assert [c["ai_output"] for c in chunks] == ["하나", "둘", "셋"]
+    assert end["type"] == "end"
+
+    with client.websocket_connect("/api/ai_hub/ws") as ws:
+        # 토큰 없이/틀린 토큰으로는 다른 연결의 스트림에 붙을 수 없다
+        for token in (None, "guess"):
+            ws.send_json({"type": "resume", "req_id": "ws-1", "resume_token": token, "last_event_id": 0})
+            error = ws.receive_json()
+            assert error["type"] == "error" and error["status_code"] == 410
+
+        ws.send_json({"type": "resume", "req_id": "ws-1", "resume_token": handshake["resume_token"], "last_event_id": 2})
+        _, *chunks, end = _receive_until_end(ws, "ws-1")
+    assert [(c["id"], c["ai_output"]) for c in chunks] == [(3, "셋")]
+    assert end["type"] == "end"
+
+
+def test_invalid_messages_are_reported(client):
+    with client.websocket_connect("/api/ai_hub/ws") as ws:
+        ws.send_text("not json")
+        assert ws.receive_json()["status_code"] == 400
+        ws.send_json({"type": "start", "request": {"req_id": "x"}})
+        assert ws.receive_json()["status_code"] == 422
+        ws.send_json({"type": "bogus"})
+        assert ws.receive_json()["status_code"] == 400
+
+
+def test_message_size_limit_counts_bytes(client, monkeypatch):
+    monkeypatch.setattr(settings, "max_request_body_bytes", 300)
+    message = _start("ws-big")
+    message["request"]["user_input"]["text"] = "가" * 100   # UTF-8 로 글자당 3바이트
+    raw = json.dumps(message, ensure_ascii=False)
+    assert len(raw) <= 300 < len(raw.encode())
+    with client.websocket_connect("/api/ai_hub/ws") as ws:
+        ws.send_text(raw)
+        error = ws.receive_json()
+    assert error["type"] == "error" and error["status_code"] == 413
@@ -0,0 +1,48 @@
+from conftest import sse_events
+from services.usage import usage_recorder
+
+
+def _gemini_chunk(text: str, **extra) -> dict:
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}], **extra}
+
+
+def test_history_roles_are_mapped_to_gemini_roles(mock_upstream):
+    client, upstream = mock_upstream([_gemini_chunk("네")], provider="gemini")
+    body = {
+        "req_id": "gemini-roles-1",
+        "model": "gemini",
+        "prompt": {"text": "system"},
+        "hist": [
+            {"role": "user", "content": "첫 질문"},
+            {"role": "assistant", "content": "첫 답변"},
+        ],
+        "user_input": {"type": "text", "text": "두 번째 질문"},
+    }
+    response = client.post("/api/ai_hub/get_prompt_res_text", json=body)
+
+    assert response.status_code == 200
+    assert [e["ai_output"] for e in sse_events(response.text) if "ai_output" in e] == ["네"]
+    (payload,) = upstream.payloads
+    assert [c["role"] for c in payload["contents"]] == ["user", "model", "user"]
+
+
+def test_usage_reports_top_level_model_version(monkeypatch, mock_upstream):
+    recorded = []
+    monkeypatch.setattr(usage_recorder, "record", lambda *args: recorded.append(args))
+    client, _ = mock_upstream(
+        [
+            _gemini_chunk("안녕", modelVersion="gemini-2.5-flash-001"),
+            _gemini_chunk(
+                "하세요",
+                modelVersion="gemini-2.5-flash-001",
+                usageMetadata={"promptTokenCount": 7, "candidatesTokenCount": 3, "thoughtsTokenCount": 2},
+            ),
+        ],
+        provider="gemini",
+    )
+    body = {"req_id": "gemini-usage-1", "model": "gemini", "prompt": {"text": ""}, "user_input": {"type": "text", "text": "hi"}}
+    assert client.post("/api/ai_hub/get_prompt_res_text", json=body).status_code == 200
+
+    (args,) = recorded
+    provider, model, _, _, prompt_tokens, completion_tokens, _ = args
+    assert (provider, model, prompt_tokens, completion_tokens) == ("gemini", "gemini-2.5-flash-001", 7, 5)
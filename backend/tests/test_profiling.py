@@ -0,0 +1,22 @@
+import threading
+
+import pytest
+
+from utils.profiling import LoopLagMonitor
+
+pytestmark = pytest.mark.anyio
+
+
+def _watchdogs() -> int:
+    return sum(1 for t in threading.enumerate() if t.name == "loop-lag-watchdog")
+
+
+async def test_restart_does_not_leak_watchdog_threads():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.02)
+    before = _watchdogs()
+    for _ in range(3):
+        monitor.start()
+        assert _watchdogs() == before + 1
+        await monitor.stop()
+        assert _watchdogs() == before
+    assert not monitor.stats()["running"]
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from services.scheduler import SchedulerTimeout, _ProviderScheduler
+
+pytestmark = pytest.mark.anyio
+
+WEIGHTS = {"interactive": 8, "background": 1}
+
+
+def _scheduler(capacity: int, background_share: float = 0.5) -> _ProviderScheduler:
+    return _ProviderScheduler("test", capacity, background_share, WEIGHTS)
+
+
+def _assert_idle(sched: _ProviderScheduler):
+    assert sched.in_flight == 0
+    for queue in sched.classes.values():
+        assert queue.in_flight == 0
+        assert queue.depth() == 0
+
+
+async def test_interactive_runs_while_background_saturates_its_share():
+    sched = _scheduler(capacity=4, background_share=0.5)
+    for _ in range(2):
+        await sched.acquire("background", "batch", None)
+    # background 몫(2)이 찼으므로 추가 background 는 대기
+    queued = [asyncio.create_task(sched.acquire("background", "batch", None)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert not any(t.done() for t in queued)
+    assert sched.classes["background"].depth() == 3
+
+    # 남은 슬롯은 interactive 가 바로 받는다
+    await asyncio.wait_for(sched.acquire("interactive", "user", None), 0.1)
+    await asyncio.wait_for(sched.acquire("interactive", "user", None), 0.1)
+    assert sched.in_flight == 4
+    assert sched.classes["background"].in_flight == 2
+
+    for _ in range(3):
+        sched.release("background")
+        await asyncio.sleep(0)
+    await asyncio.gather(*queued)
+    for _ in range(2):
+        sched.release("interactive")
+    for _ in range(2):
+        sched.release("background")
+    _assert_idle(sched)
+
+
+async def test_burst_from_one_client_interleaves_with_others():
+    sched = _scheduler(capacity=1)
+    await sched.acquire("interactive", "holder", None)
+    order = []
+
+    async def request(client: str):
+        await sched.acquire("interactive", client, None)
+        order.append(client)
+        await asyncio.sleep(0)
+        sched.release("interactive")
+
+    # a 가 먼저 3건을 몰아 넣고 b 가 2건을 넣는다
+    tasks = [asyncio.create_task(request(c)) for c in ("a", "a", "a", "b", "b")]
+    await asyncio.sleep(0)
+    sched.release("interactive")
+    await asyncio.gather(*tasks)
+
+    assert order == ["a", "b", "a", "b", "a"]
+    _assert_idle(sched)
+
+
+async def test_timeout_leaves_counters_balanced():
+    sched = _scheduler(capacity=1)
+    await sched.acquire("interactive", "holder", None)
+    with pytest.raises(SchedulerTimeout):
+        await sched.acquire("interactive", "late", 0.01)
+    assert sched.classes["interactive"].timeouts == 1
+
+    sched.release("interactive")
+    _assert_idle(sched)
+
+
+async def test_cancel_while_queued_leaves_counters_balanced():
+    sched = _scheduler(capacity=1)
+    await sched.acquire("interactive", "holder", None)
+    task = asyncio.create_task(sched.acquire("interactive", "gone", None))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    sched.release("interactive")
+    _assert_idle(sched)
+
+
+async def test_cancel_right_after_grant_returns_the_slot():
+    sched = _scheduler(capacity=1)
+    await sched.acquire("interactive", "holder", None)
+    task = asyncio.create_task(sched.acquire("interactive", "gone", None))
+    await asyncio.sleep(0)
+    # 슬롯이 넘어간 직후(대기자가 깨어나기 전) 취소
+    sched.release("interactive")
+    assert sched.in_flight == 1
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    _assert_idle(sched)
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from db.models import Prompt
+from db.session import read_session
+from routes.search_api import _ranked_query
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class _StubSession:
+    """실행된 select 를 기록하고 미리 정한 행을 돌려주는 세션."""
+
+    def __init__(self, rows_per_query):
+        self.rows_per_query = list(rows_per_query)
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Result(self.rows_per_query.pop(0))
+
+
+def test_ranked_query_uses_indexed_operators():
+    score, cond = _ranked_query(Prompt, Prompt.title, "배송 조회")
+    sql = str(cond.compile(dialect=postgresql.dialect()))
+    assert "prompts.search_vector @@ websearch_to_tsquery" in sql
+    assert "prompts.title %%>" in sql   # pyformat 이스케이프된 %>
+    assert "ts_rank_cd" in str(score.compile(dialect=postgresql.dialect()))
+
+
+@pytest.fixture
+def search_client(mock_upstream):
+    """read_session 을 _StubSession 으로 바꾼 (client, session)."""
+    import main
+
+    client, _ = mock_upstream([])
+    session = _StubSession([])
+
+    async def stub():
+        yield session
+
+    main.app.dependency_overrides[read_session] = stub
+    yield client, session
+    main.app.dependency_overrides.pop(read_session, None)
+
+
+def test_search_route_pages_and_orders(search_client):
+    client, session = search_client
+    prompts = [{"id": str(i), "title": f"p{i}", "description": None, "labels": [], "updated_at": None, "score": 1.0} for i in range(3)]
+    session.rows_per_query = [prompts, []]
+
+    response = client.get("/api/search", params={"q": "  배송 ", "limit": 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["q"] == "배송"
+    assert [p["id"] for p in body["prompts"]] == ["0", "1"]
+    assert body["prompts_has_more"] is True
+    assert body["templates"] == [] and body["templates_has_more"] is False
+    prompt_sql, template_sql = session.statements
+    assert "ORDER BY score DESC, prompts.updated_at DESC" in prompt_sql
+    assert "FROM templates" in template_sql
+    assert "content" not in prompt_sql.split("FROM")[0]   # 본문 컬럼은 선택하지 않음
+
+
+def test_search_rejects_invalid_params(search_client):
+    client, session = search_client
+    assert client.get("/api/search", params={"q": ""}).status_code == 422
+    assert client.get("/api/search", params={"q": "a", "limit": 1000}).status_code == 422
+    assert client.get("/api/search", params={"q": "a", "kind": "users"}).status_code == 422
+    assert session.statements == []
@@ -0,0 +1,135 @@
+import pytest
+
+from config.settings import settings
+from conftest import openai_chunks
+from services.similarity_cache import SimilarityCache, fields_key
+
+QUESTION = "제 주문은 언제 도착하나요? 배송 조회를 부탁드립니다. 주문번호는 A-1024 입니다."
+NEAR = "제 주문은 언제 도착하나요?? 배송 조회를 부탁드립니다. 주문번호는 A-1024 입니다"
+OTHER = "환불 규정이 어떻게 되나요? 사용하지 않은 상품도 반품 배송비가 드나요?"
+SCOPE = ("prompt-1", "hash", "openai", "gpt-4o", "client-1", "")
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setattr(settings, "similarity_cache_threshold", 0.8)
+    monkeypatch.setattr(settings, "similarity_cache_shadow", False)
+    monkeypatch.setattr(settings, "similarity_cache_max_text_chars", 20_000)
+
+
+def test_near_duplicate_hits_and_unrelated_misses():
+    cache = SimilarityCache(max_entries=10, max_bytes=1_000_000)
+    cache.store(SCOPE, QUESTION, "내일 도착 예정입니다.")
+
+    answer, score = cache.lookup(SCOPE, NEAR)
+    assert answer == "내일 도착 예정입니다."
+    assert score >= 0.8
+
+    answer, score = cache.lookup(SCOPE, OTHER)
+    assert answer is None
+    assert score < 0.8
+
+
+def test_threshold_is_respected(monkeypatch):
+    cache = SimilarityCache(max_entries=10, max_bytes=1_000_000)
+    cache.store(SCOPE, QUESTION, "answer")
+    monkeypatch.setattr(settings, "similarity_cache_threshold", 1.01)
+    answer, _ = cache.lookup(SCOPE, QUESTION)
+    assert answer is None
+
+
+def test_shadow_mode_never_serves(monkeypatch):
+    cache = SimilarityCache(max_entries=10, max_bytes=1_000_000)
+    cache.store(SCOPE, QUESTION, "answer")
+    monkeypatch.setattr(settings, "similarity_cache_shadow", True)
+    answer, score = cache.lookup(SCOPE, QUESTION)
+    assert answer is None
+    assert score == 1.0
+    assert cache.stats["shadow_hits"] == 1
+
+
+def test_scopes_are_isolated():
+    cache = SimilarityCache(max_entries=10, max_bytes=1_000_000)
+    cache.store(SCOPE, QUESTION, "answer")
+    for other_scope in (("prompt-2",) + SCOPE[1:], SCOPE[:3] + ("gpt-4o-mini",)):
+        answer, _ = cache.lookup(other_scope, QUESTION)
+        assert answer is None
+
+
+def test_evicts_by_entry_count_lru():
+    cache = SimilarityCache(max_entries=2, max_bytes=1_000_000)
+    cache.store(SCOPE, QUESTION, "q")
+    cache.store(SCOPE, OTHER, "o")
+    assert cache.lookup(SCOPE, QUESTION)[0] == "q"   # QUESTION 을 최근 사용으로
+    cache.store(SCOPE, "완전히 다른 세 번째 질문입니다. 영업시간이 언제인가요?", "t")
+
+    assert cache.lookup(SCOPE, OTHER)[0] is None
+    assert cache.lookup(SCOPE, QUESTION)[0] == "q"
+    assert cache.stats["evictions"] == 1
+    assert not any(cache._bands.get(k) is None for k in cache._bands)
+
+
+def test_evicts_by_byte_budget():
+    cache = SimilarityCache(max_entries=100, max_bytes=3_000)
+    cache.store(SCOPE, QUESTION, "가" * 500)   # 1500 bytes + 서명
+    cache.store(SCOPE, OTHER, "나" * 500)
+    assert len(cache._entries) == 1
+    assert cache.bytes <= 3_000
+    assert cache.lookup(SCOPE, OTHER)[0] == "나" * 500
+
+    cache.store(SCOPE, QUESTION, "x" * 10_000)   # 단독으로 예산 초과 -> 저장하지 않음
+    assert cache.lookup(SCOPE, QUESTION)[0] is None
+
+
+def test_band_index_is_cleaned_on_eviction():
+    cache = SimilarityCache(max_entries=1, max_bytes=1_000_000)
+    cache.store(SCOPE, QUESTION, "q")
+    cache.store(SCOPE, OTHER, "o")
+    indexed = set().union(*cache._bands.values())
+    assert indexed == set(cache._entries)
+
+
+def test_too_long_input_is_not_cached(monkeypatch):
+    monkeypatch.setattr(settings, "similarity_cache_max_text_chars", 20)
+    cache = SimilarityCache(max_entries=10, max_bytes=1_000_000)
+    cache.store(SCOPE, QUESTION, "answer")
+    assert not cache._entries
+    assert cache.lookup(SCOPE, QUESTION) == (None, 0.0)
+    assert cache.stats["skipped_too_long"] == 1
+
+
+def test_fields_key_is_exact_after_normalization():
+    assert fields_key(None) == fields_key({}) == ""
+    assert fields_key({"order": "A-1024", "memo": "빨리 "}) == fields_key({"memo": "빨리", "order": "a-1024"})
+    assert fields_key({"order": "A-1024"}) != fields_key({"order": "A-1025"})
+
+
+def _form_body(order: str) -> dict:
+    form = {"name": "홍길동", "order": order, "question": "제 주문은 언제 도착하나요? 배송 조회를 부탁드립니다."}
+    return {
+        "req_id": f"form-{order}",
+        "model": "gpt-4o",
+        "prompt": {"id": "shipping", "text": "배송 안내"},
+        "user_input": {"type": "form", "form": form},
+    }
+
+
+def test_changed_form_field_is_a_miss(monkeypatch, mock_upstream):
+    from routes import text_submit
+
+    monkeypatch.setattr(settings, "similarity_cache_prompts", "shipping")
+    monkeypatch.setattr(text_submit, "similarity_cache", SimilarityCache(max_entries=10, max_bytes=1_000_000))
+    client, upstream = mock_upstream(openai_chunks("내일", " 도착"))
+
+    def post(order: str, client_key: str = "team-a"):
+        response = client.post("/api/ai_hub/get_prompt_res_text", json=_form_body(order), headers={"X-Client-Key": client_key})
+        assert response.status_code == 200
+        return response.headers["X-Similarity-Cache"]
+
+    assert post("A-1024") == "miss"
+    assert post("A-1024") == "hit"
+    # 렌더링된 텍스트는 거의 같지만(Jaccard > 0.9) 필드 값이 다르므로 재사용하지 않음
+    assert post("A-1025") == "miss"
+    # 다른 클라이언트에는 다른 클라이언트의 응답을 주지 않음
+    assert post("A-1024", client_key="team-b") == "miss"
+    assert len(upstream.requests) == 3
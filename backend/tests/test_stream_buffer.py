@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from config.settings import settings
+from conftest import openai_chunks, sse_events
+from services.stream_buffer import StreamBufferRegistry, StreamExpired
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setattr(settings, "stream_buffer_max_bytes", 1_000_000)
+    monkeypatch.setattr(settings, "stream_buffer_ttl", 120.0)
+    monkeypatch.setattr(settings, "stream_abandon_grace", 30.0)
+
+
+async def _collect(buffer, after=0):
+    return [item async for item in buffer.follow(after)]
+
+
+async def test_follow_from_sequence():
+    buf = StreamBufferRegistry().create("r1")
+    for text in ("a", "b", "c"):
+        buf.append(text)
+    buf.finish()
+    assert await _collect(buf) == [(1, "a"), (2, "b"), (3, "c")]
+    assert await _collect(buf, 2) == [(3, "c")]
+
+
+async def test_follow_waits_for_producer():
+    buf = StreamBufferRegistry().create("r1")
+    reader = asyncio.create_task(_collect(buf))
+    await asyncio.sleep(0)
+    buf.append("a")
+    await asyncio.sleep(0)
+    buf.append("b")
+    buf.finish()
+    assert await reader == [(1, "a"), (2, "b")]
+
+
+async def test_trimming_moves_base_and_expires_old_offsets(monkeypatch):
+    monkeypatch.setattr(settings, "stream_buffer_max_bytes", 10)
+    buf = StreamBufferRegistry().create("r1")
+    for text in ("aaaa", "bbbb", "cccc", "dddd"):
+        buf.append(text)
+    buf.finish()
+    assert buf.base == 2 and buf.size <= 10
+    assert await _collect(buf, 2) == [(3, "cccc"), (4, "dddd")]
+    with pytest.raises(StreamExpired):
+        await _collect(buf, 1)
+
+
+async def test_trimming_while_reader_is_behind(monkeypatch):
+    monkeypatch.setattr(settings, "stream_buffer_max_bytes", 4)
+    buf = StreamBufferRegistry().create("r1")
+    buf.append("aaaa")
+    events = buf.follow(0)
+    assert await events.__anext__() == (1, "aaaa")
+    buf.append("bbbb")
+    buf.append("cccc")   # 아직 읽지 않은 2번이 밀려남
+    with pytest.raises(StreamExpired):
+        await events.__anext__()
+
+
+async def test_resume_requires_token():
+    registry = StreamBufferRegistry()
+    buf = registry.create("r1")
+    buf.set_handshake({"req_id": "r1", "result_code": 0, "result_msg": "ok"})
+    token = buf.handshake["resume_token"]
+    assert registry.get("r1", token) is buf
+    assert registry.get("r1", None) is None
+    assert registry.get("r1", "wrong") is None
+    assert registry.get("r1", "한글토큰") is None
+    assert registry.get("r2", token) is None
+
+
+async def test_failed_handshake_has_no_token():
+    buf = StreamBufferRegistry().create("r1")
+    buf.set_handshake({"req_id": "r1", "result_code": 503, "result_msg": "busy"})
+    assert "resume_token" not in buf.handshake
+
+
+async def test_same_req_id_from_different_clients_coexists():
+    # req_id 는 클라이언트가 정하므로(Date.now()) 동시에 겹칠 수 있다: 각자 자기 토큰으로만 이어받는다
+    registry = StreamBufferRegistry()
+    first = registry.create("1700000000000")
+    second = registry.create("1700000000000")
+    assert second is not first
+    assert registry.get("1700000000000", first.resume_token) is first
+    assert registry.get("1700000000000", second.resume_token) is second
+
+
+async def test_completed_buffers_expire_after_ttl(monkeypatch):
+    registry = StreamBufferRegistry()
+    buf = registry.create("r1")
+    buf.set_handshake({"req_id": "r1", "result_code": 0, "result_msg": "ok"})
+    buf.finish()
+    token = buf.resume_token
+    monkeypatch.setattr(settings, "stream_buffer_ttl", 0.0)
+    await asyncio.sleep(0.01)
+    assert registry.get("r1", token) is None
+
+
+async def test_abandoned_stream_cancels_producer(monkeypatch):
+    monkeypatch.setattr(settings, "stream_abandon_grace", 0.05)
+    buf = StreamBufferRegistry().create("r1")
+    buf.task = asyncio.create_task(asyncio.sleep(10))
+    await asyncio.sleep(0.1)
+    assert buf.task.cancelled()
+    assert buf.done and buf.error.startswith("abandoned")
+
+
+async def test_attached_reader_keeps_producer_alive(monkeypatch):
+    monkeypatch.setattr(settings, "stream_abandon_grace", 0.05)
+    buf = StreamBufferRegistry().create("r1")
+    buf.task = asyncio.create_task(asyncio.sleep(10))
+    reader = asyncio.create_task(_collect(buf))
+    await asyncio.sleep(0.1)
+    assert not buf.task.done()
+
+    reader.cancel()   # 연결이 끊기면 유예 시간 뒤 취소
+    await asyncio.sleep(0.1)
+    assert buf.task.cancelled()
+
+
+def test_sse_resume_endpoint(mock_upstream):
+    client, _ = mock_upstream(openai_chunks("안녕", "하세요"))
+    body = {"req_id": "resume-1", "model": "gpt-4o", "prompt": {"text": ""}, "user_input": {"type": "text", "text": "hi"}}
+
+    first = sse_events(client.post("/api/ai_hub/get_prompt_res_text", json=body).text)
+    token = first[0]["resume_token"]
+    assert [e["ai_output"] for e in first[1:]] == ["안녕", "하세요"]
+
+    for headers in ({"Last-Event-ID": "0"}, {"Last-Event-ID": "0", "X-Resume-Token": "guess"}):
+        assert client.post("/api/ai_hub/get_prompt_res_text", json=body, headers=headers).status_code == 410
+
+    resumed = client.post(
+        "/api/ai_hub/get_prompt_res_text", json=body, headers={"Last-Event-ID": "1", "X-Resume-Token": token}
+    )
+    assert [e.get("ai_output") for e in sse_events(resumed.text)[1:]] == ["하세요"]
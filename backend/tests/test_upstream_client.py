@@ -0,0 +1,27 @@
+from config.settings import settings
+from conftest import openai_chunks
+from services import get_service
+
+BODY = {"req_id": "no-key-1", "model": "gpt-4o", "prompt": {"text": ""}, "user_input": {"type": "text", "text": "hi"}}
+
+
+def test_missing_api_key_is_503(monkeypatch, mock_upstream):
+    client, upstream = mock_upstream(openai_chunks("x"))
+    monkeypatch.setattr(get_service("openai"), "api_key", None)
+    monkeypatch.setattr(settings, "upstream_cassette_mode", None)
+
+    response = client.post("/api/ai_hub/get_prompt_res_text", json=BODY)
+    assert response.status_code == 503
+    assert "OPENAI_API_KEY" in response.json()["detail"]
+    assert not upstream.requests
+
+
+def test_replay_mode_does_not_need_api_key(monkeypatch, mock_upstream):
+    # mock 전송이 카세트 재생 transport 역할을 대신한다
+    client, upstream = mock_upstream(openai_chunks("재생"))
+    monkeypatch.setattr(get_service("openai"), "api_key", None)
+    monkeypatch.setattr(settings, "upstream_cassette_mode", "replay")
+
+    response = client.post("/api/ai_hub/get_prompt_res_text", json=BODY)
+    assert response.status_code == 200
+    assert len(upstream.requests) == 1
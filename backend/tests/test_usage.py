@@ -0,0 +1,53 @@
+import asyncio
+
+import httpx
+import pytest
+
+from config.settings import settings
+from services.usage import UsageRecorder, usage_recorder
+
+ADMIN = {"X-Admin-Token": "admin-secret"}
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "admin-secret")
+    monkeypatch.setattr(settings, "database_url", None)
+
+
+def test_usage_endpoint_requires_admin(mock_upstream):
+    client, _ = mock_upstream([])
+    assert client.get("/api/usage").status_code == 403
+    assert client.get("/api/usage", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/api/usage", headers=ADMIN).status_code == 200
+
+
+def test_usage_is_recorded_when_stream_fails(mock_upstream):
+    # usage 이벤트까지 보낸 뒤 연결이 끊기는 업스트림
+    client, _ = mock_upstream(
+        [
+            {"model": "gpt-4o", "choices": [{"delta": {"content": "부분"}}]},
+            {"model": "gpt-4o", "choices": [], "usage": {"prompt_tokens": 11, "completion_tokens": 5}},
+        ],
+        done=False,
+        error=httpx.ReadError("connection reset"),
+    )
+    before = usage_recorder.recorded
+
+    body = {"req_id": "usage-fail-1", "model": "gpt-4o", "prompt": {"text": ""}, "user_input": {"type": "text", "text": "hi"}}
+    with pytest.raises(RuntimeError, match="connection reset"):
+        client.post("/api/ai_hub/get_prompt_res_text", json=body, headers={"X-Client-Key": "team-x"})
+
+    assert usage_recorder.recorded == before + 1
+    rows = client.get("/api/usage", params={"group_by": "client_key", "bucket": "minute"}, headers=ADMIN).json()["series"]
+    row = next(r for r in rows if r["client_key"] == "team-x")
+    assert (row["prompt_tokens"], row["completion_tokens"]) == (11, 5)
+
+
+def test_flush_without_database_keeps_recent_window():
+    recorder = UsageRecorder()
+    recorder.record("openai", "gpt-4o", "p", "c", 10, 5, 1.0)
+    recorder.record("openai", "gpt-4o", "p", "c", 2, 1, 1.0)
+    assert asyncio.run(recorder.flush()) == 0
+    (values,) = recorder.recent(0, float("inf")).values()
+    assert values == [2, 12, 6, 2.0]
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from config.settings import settings
+from services import warmup
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    monkeypatch.setitem(warmup.readiness, "ready", False)
+    monkeypatch.setitem(warmup.readiness, "attempts", 0)
+    monkeypatch.setitem(warmup.readiness, "errors", {})
+    monkeypatch.setitem(warmup.readiness, "warmup_ms", {})
+
+
+async def test_ready_immediately_without_prewarm(monkeypatch):
+    monkeypatch.setattr(settings, "prewarm_enabled", False)
+    warmup.start_warmup()
+    assert warmup.is_ready()
+
+
+async def test_not_ready_until_prewarm_succeeds(monkeypatch):
+    monkeypatch.setattr(settings, "prewarm_enabled", True)
+    monkeypatch.setattr(warmup, "RETRY_MAX_DELAY", 0.01)
+    calls = []
+
+    async def flaky_db():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("db down")
+
+    monkeypatch.setattr(warmup, "_targets", lambda: {"db": flaky_db})
+    original_sleep = asyncio.sleep
+    monkeypatch.setattr(warmup.asyncio, "sleep", lambda delay: original_sleep(0))
+
+    warmup.start_warmup()
+    while not calls:
+        await original_sleep(0)
+    await original_sleep(0)
+    assert not warmup.is_ready()
+    assert warmup.readiness["errors"] == {"db": "db down"}
+
+    await warmup._task
+    assert warmup.is_ready()
+    assert warmup.readiness["attempts"] == 3
+    assert warmup.readiness["errors"] == {}
+    await warmup.stop_warmup()
+
+
+async def test_stop_cancels_pending_prewarm(monkeypatch):
+    monkeypatch.setattr(settings, "prewarm_enabled", True)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(warmup, "_targets", lambda: {"db": hang})
+    warmup.start_warmup()
+    await asyncio.sleep(0)
+    await warmup.stop_warmup()
+    assert not warmup.is_ready()
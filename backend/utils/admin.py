@@ -0,0 +1,19 @@
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+from config.settings import settings
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """ADMIN_TOKEN 이 설정되어 있고 일치할 때만 True (미설정이면 관리 기능 비활성)."""
+    if not settings.admin_token or not token:
+        return False
+    # str 비교는 비 ASCII 입력에서 TypeError 를 내므로 바이트로 비교
+    return hmac.compare_digest(token.encode(), settings.admin_token.encode())
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="admin token required")
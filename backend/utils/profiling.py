@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# 단계별 타이밍
+# ---------------------------------------------------------------------------
+
+_phase_samples: dict[str, deque] = {}
+
+
+class PhaseTimer:
+    """
+    요청 하나의 단계별 소요 시간(ms). mark(name) 은 직전 mark 이후 경과 시간을 name 에 기록한다.
+    """
+
+    def __init__(self, started_at: Optional[float] = None):
+        self._last = started_at if started_at is not None else time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self.phases[name] = round((now - self._last) * 1000, 2)
+        self._last = now
+
+    def record(self):
+        """전역 단계 통계에 반영."""
+        for name, ms in self.phases.items():
+            _phase_samples.setdefault(name, deque(maxlen=1000)).append(ms)
+
+
+def phase_stats() -> dict:
+    out = {}
+    for name, samples in _phase_samples.items():
+        values = sorted(samples)
+        out[name] = {
+            "count": len(values),
+            "avg_ms": round(sum(values) / len(values), 2),
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max_ms": values[-1],
+        }
+    return out
+
+
+# ---------------------------------------------------------------------------
+# 샘플링 프로파일러
+# ---------------------------------------------------------------------------
+
+def _folded_stack(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    별도 스레드에서 대상 스레드(이벤트 루프)의 스택을 주기적으로 샘플링한다.
+    결과는 flamegraph 도구에서 바로 쓸 수 있는 folded stack 형식.
+    이벤트 루프는 공유되므로, 같은 시간대의 다른 요청 처리도 샘플에 포함된다.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_folded_stack(frame)] += 1
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def report(self, title: str, phases: Optional[dict] = None, top: int = 30) -> str:
+        total = sum(self.samples.values())
+        lines = [
+            f"# profile: {title}",
+            f"# duration_ms: {self.duration * 1000:.1f}  samples: {total}  interval_ms: {self.interval * 1000:.1f}",
+        ]
+        if phases:
+            lines.append("# phases_ms: " + ", ".join(f"{k}={v}" for k, v in phases.items()))
+        # 리프 함수 기준 상위 항목
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        lines.append("# top (self):")
+        for name, count in leaves.most_common(top):
+            lines.append(f"#   {count / total * 100 if total else 0:5.1f}%  {name}")
+        lines.append("# folded stacks:")
+        lines.extend(f"{stack} {count}" for stack, count in self.samples.most_common())
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# 이벤트 루프 지연 모니터
+# ---------------------------------------------------------------------------
+
+class LoopLagMonitor:
+    """
+    루프 안의 하트비트 태스크가 주기적으로 시각을 갱신하고, 감시 스레드가 하트비트가
+    threshold 이상 멈춘 것을 발견하면 그 순간 루프 스레드의 스택(=루프를 막고 있는 코드)을 잡아 둔다.
+    """
+
+    def __init__(self, interval: float, threshold: float, max_stalls: int = 100):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: deque = deque(maxlen=max_stalls)
+        self.max_lag_ms = 0.0
+        self.ticks = 0
+        self._heartbeat = time.monotonic()
+        self._pending: Optional[dict] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            self.ticks += 1
+            self.max_lag_ms = max(self.max_lag_ms, lag * 1000)
+            pending, self._pending = self._pending, None
+            if lag >= self.threshold:
+                stall = pending or {"task": None, "stack": None}
+                stall.update({"at": time.time(), "lag_ms": round(lag * 1000, 1)})
+                self.stalls.append(stall)
+                logger.warning("[LoopLag] Event loop stalled", extra={"lag_ms": stall["lag_ms"], "task": stall["task"]})
+
+    def _watch(self, stop: threading.Event):
+        while not stop.wait(self.threshold / 2):
+            if self._pending is not None or time.monotonic() - self._heartbeat < self.threshold + self.interval:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            coro = None
+            try:
+                # 다른 스레드에서 루프의 현재 태스크를 읽기만 한다(공개 API, 실패해도 스택은 남김)
+                task = asyncio.current_task(self._loop)
+                coro = task.get_coro() if task else None
+            except Exception:
+                task = None
+            self._pending = {
+                "task": getattr(coro, "__qualname__", None) or (task.get_name() if task else None),
+                "stack": "".join(traceback.format_stack(frame, limit=15)) if frame is not None else None,
+            }
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        # 시작마다 새 Event: 이전 감시 스레드가 아직 안 끝났더라도 clear() 로 되살아나지 않게
+        self._stop = threading.Event()
+        self._task = asyncio.create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, args=(self._stop,), name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            # 감시 스레드는 최대 threshold/2 초 뒤 깨어나 종료하므로 루프를 막지 않도록 스레드에서 대기
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "threshold_ms": self.threshold * 1000,
+            "ticks": self.ticks,
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "stall_count": len(self.stalls),
+            "recent_stalls": [{k: v for k, v in s.items() if k != "stack"} for s in list(self.stalls)[-10:]],
+        }